@@ -0,0 +1,82 @@
+"""
+Shared API logic
+Query parsing, payloads and the event stream policy used by both HTTP front-ends:
+the built-in aiohttp server (api_server.py) and the Flask web dashboard (web_dashboard.py)
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Mapping, Optional, Tuple
+from heatmap import ActivityHeatmap
+from history import RESOLUTIONS, parse_time, pick_resolution
+
+STREAM_POLL_INTERVAL = 1  # seconds between state version checks
+STREAM_KEEPALIVE = 15  # seconds between keep-alive comments on idle streams
+STREAM_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+DEFAULT_HISTORY_SPAN = timedelta(days=1)
+_NO_VERSION = object()  # Differs from every version, so the first poll always sends the status
+
+def offline_status() -> Dict:
+    """Status payload while no bot data is available"""
+    return {'status': 'offline', 'total_members': 0, 'online_members': 0,
+            'last_update': None, 'guild_id': None}
+
+def parse_history_query(query: Mapping[str, str],
+                        retention: Optional[Callable[[str], float]] = None) -> Tuple[datetime, datetime, str]:
+    """Validate ?from=&to=&resolution= into naive local bounds and a resolution name
+
+    ``retention`` gives the seconds of history a resolution still covers, for sources that
+    drop fine-grained data; 'auto' then picks one that reaches back to 'from' and an explicit
+    resolution that does not is rejected. Raises ValueError with a message for the client.
+    """
+    now = datetime.now()
+    try:
+        end = parse_time(query.get('to'), now)
+        start = parse_time(query.get('from'), end - DEFAULT_HISTORY_SPAN)
+    except ValueError:
+        raise ValueError("'from' and 'to' must be ISO datetimes or epoch seconds") from None
+    if start >= end:
+        raise ValueError("'from' must be before 'to'")
+
+    resolution = query.get('resolution', 'auto')
+    if resolution != 'auto' and resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of: auto, {', '.join(RESOLUTIONS)}")
+    if retention is None:
+        return start, end, pick_resolution(start, end) if resolution == 'auto' else resolution
+
+    age = (now - start).total_seconds()
+    if resolution == 'auto':
+        resolution = pick_resolution(start, end)
+        covering = [name for name in RESOLUTIONS if retention(name) >= age]
+        if covering and RESOLUTIONS[covering[0]] > RESOLUTIONS[resolution]:
+            resolution = covering[0]
+    if retention(resolution) < age:
+        raise ValueError(f"'{resolution}' history only reaches back {retention(resolution) / 3600:g} hours")
+    return start, end, resolution
+
+def heatmap_payload(guild_id: Optional[int], heatmap: Optional[ActivityHeatmap]) -> Tuple[Dict, int]:
+    """Heatmap response body and status code"""
+    if guild_id is None or heatmap is None:
+        return {'error': "no heatmap recorded for this guild"}, 404
+    return {'guild_id': guild_id, **heatmap.as_dict()}, 200
+
+class StatusStream:
+    """Decides what an SSE status stream sends on each poll: the status when the version moved,
+    a keep-alive comment after STREAM_KEEPALIVE idle seconds, or nothing"""
+
+    def __init__(self):
+        self.last_version = _NO_VERSION
+        self.idle = 0.0
+
+    def poll(self, version, payload: Callable[[], Dict]) -> Optional[str]:
+        """Frame to write for this poll (the caller sleeps STREAM_POLL_INTERVAL between polls)"""
+        frame = None
+        if version != self.last_version:
+            self.last_version = version
+            self.idle = 0.0
+            frame = f"event: status\ndata: {json.dumps(payload())}\n\n"
+        elif self.idle >= STREAM_KEEPALIVE:
+            self.idle = 0.0
+            frame = ": keep-alive\n\n"
+        self.idle += STREAM_POLL_INTERVAL
+        return frame
@@ -0,0 +1,152 @@
+"""
+Built-in HTTP API
+Small aiohttp server running on the bot's event loop (aiohttp already ships with discord.py).
+Serves metrics and, in the combined runtime, the dashboard API straight from the bot's in-memory state
+"""
+
+import asyncio
+import hmac
+import logging
+from datetime import datetime
+from typing import Optional
+from aiohttp import web
+from metrics import REGISTRY, Registry
+from rollups import RollupSeries
+from api_common import (STREAM_HEADERS, STREAM_POLL_INTERVAL, StatusStream, heatmap_payload,
+                        offline_status, parse_history_query)
+
+logger = logging.getLogger(__name__)
+
+class ApiServer:
+    """Serves /metrics and the live /api/* routes from inside the bot process"""
+
+    def __init__(self, host: str, port: int, bot=None, registry: Optional[Registry] = None):
+        self.host = host
+        self.port = port
+        self.bot = bot
+        self.registry = registry or REGISTRY
+        self.app = web.Application()
+        self.app.router.add_get("/metrics", self.handle_metrics)
+        if bot is not None:
+            self.app.router.add_get("/api/status", self.handle_status)
+            self.app.router.add_get("/api/history", self.handle_history)
+            self.app.router.add_get("/api/heatmap", self.handle_heatmap)
+            self.app.router.add_get("/api/stream", self.handle_stream)
+            self.app.router.add_get("/api/health", self.handle_health)
+            if getattr(bot.config, "admin_token", None):
+                self.app.router.add_get("/admin/profile", self.handle_profile_status)
+                self.app.router.add_post("/admin/profile", self.handle_profile_request)
+        self._runner: Optional[web.AppRunner] = None
+        self._closing = False  # Ends open event streams so shutdown does not wait on them
+
+    async def start(self):
+        """Bind the listening socket"""
+        self._closing = False
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"📈 API listening on http://{self.host}:{self.port} (/metrics{', /api/*' if self.bot else ''})")
+
+    async def stop(self):
+        """Close the listening socket and open connections"""
+        self._closing = True
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """Current metrics in the Prometheus text format"""
+        return web.Response(body=self.registry.render().encode(),
+                            headers={"Content-Type": Registry.CONTENT_TYPE})
+
+    def _get_guild(self, request: web.Request):
+        """Guild of the requested dashboard (?guild=), or the first one"""
+        value = request.query.get("guild")
+        try:
+            guild_id = int(value) if value else None
+        except ValueError:
+            raise web.HTTPBadRequest(text="'guild' must be a guild ID")
+
+        for target in self.bot.guild_targets.values():
+            if target.is_active and (guild_id is None or target.guild_id == guild_id):
+                return target.guild
+        return None
+
+    def _status(self, guild) -> dict:
+        """Live status of a guild, or the offline shape while the bot is not ready"""
+        if guild is None or not self.bot.is_ready:
+            return offline_status()
+        return self.bot.dashboard.get_live_status(guild)
+
+    async def handle_status(self, request: web.Request) -> web.Response:
+        """Bot status from the live counters"""
+        return web.json_response(self._status(self._get_guild(request)))
+
+    async def handle_history(self, request: web.Request) -> web.Response:
+        """Downsampled member history from the in-memory rollups
+
+        Unlike the web dashboard's /api/history, which reads the snapshot journal, only the rollups'
+        retention is covered: 'auto' picks a resolution that reaches back to 'from', an explicit
+        resolution that does not is rejected.
+        """
+        guild = self._get_guild(request)
+        try:
+            start, end, resolution = parse_history_query(request.query, RollupSeries.retention)
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        if guild is None:
+            return web.json_response({'error': "no dashboard guild to read history for"}, status=400)
+
+        points = self.bot.dashboard.growth_tracker.get_history(guild.id, resolution, start, end)
+        return web.json_response({'guild_id': guild.id, 'resolution': resolution, 'points': points})
+
+    async def handle_heatmap(self, request: web.Request) -> web.Response:
+        """Hour-of-week activity heatmap from the running sums"""
+        guild = self._get_guild(request)
+        heatmap = self.bot.dashboard.growth_tracker.heatmaps.get(guild.id) if guild else None
+        body, status = heatmap_payload(guild.id if guild else None, heatmap)
+        return web.json_response(body, status=status)
+
+    async def handle_stream(self, request: web.Request) -> web.StreamResponse:
+        """Server-Sent Events stream that pushes the status whenever a published value changes"""
+        guild = self._get_guild(request)
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', **STREAM_HEADERS})
+        await response.prepare(request)
+
+        state_writer = self.bot.dashboard.state_writer
+        stream = StatusStream()
+        try:
+            while not self._closing:
+                frame = stream.poll(state_writer.version(), lambda: self._status(guild))
+                if frame:
+                    await response.write(frame.encode())
+                await asyncio.sleep(STREAM_POLL_INTERVAL)
+        except ConnectionResetError:
+            pass  # Client went away
+        return response
+
+    def _check_admin(self, request: web.Request):
+        """Require the configured admin token as a bearer token"""
+        expected = f"Bearer {self.bot.config.admin_token}"
+        if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected.encode()):
+            raise web.HTTPUnauthorized(text="admin token required")
+
+    async def handle_profile_status(self, request: web.Request) -> web.Response:
+        """Slow-tick counters and the state of the profiling capture"""
+        self._check_admin(request)
+        return web.json_response(self.bot.profiler.get_status())
+
+    async def handle_profile_request(self, request: web.Request) -> web.Response:
+        """Profile the next ?ticks=N dashboard ticks"""
+        self._check_admin(request)
+        try:
+            ticks = int(request.query["ticks"]) if "ticks" in request.query else None
+        except ValueError:
+            return web.json_response({'error': "'ticks' must be an integer"}, status=400)
+        self.bot.profiler.request(ticks)
+        return web.json_response(self.bot.profiler.get_status(), status=202)
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        """Health check endpoint"""
+        return web.json_response({'status': 'healthy' if self.bot.is_ready else 'starting',
+                                  'timestamp': datetime.now().isoformat()})
@@ -0,0 +1,53 @@
+"""
+Approximate guild counts for the low-memory counts-only mode
+Reads totals from fetch_guild(with_counts=True) instead of caching every member and presence
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import discord
+
+logger = logging.getLogger(__name__)
+
+class ApproximateCounts:
+    """Per-guild approximate member/presence counts, refreshed at most once per ``ttl``"""
+
+    def __init__(self, fetch_guild: Callable[..., Awaitable[discord.Guild]], ttl: float = 60):
+        self.fetch_guild = fetch_guild
+        self.ttl = ttl  # Seconds a fetched count is reused
+        self.counts: Dict[int, Tuple[int, int, datetime]] = {}  # guild ID -> (members, presences, fetched at)
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    async def refresh(self, guild: discord.Guild):
+        """Fetch fresh counts for a guild unless the cached ones are recent enough"""
+        lock = self._locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            cached = self.counts.get(guild.id)
+            if cached and (datetime.now() - cached[2]).total_seconds() < self.ttl:
+                return
+            try:
+                fetched = await self.fetch_guild(guild.id, with_counts=True)
+            except discord.HTTPException as e:
+                logger.warning(f"⚠️  Could not fetch approximate counts for {guild.name}: {e}")
+                return
+            self.counts[guild.id] = (
+                fetched.approximate_member_count or 0,
+                fetched.approximate_presence_count or 0,
+                datetime.now()
+            )
+
+    def get_member_statistics(self, guild: discord.Guild) -> Dict[str, Optional[int]]:
+        """Member statistics in DashboardCreator's shape; per-status counts are unknown (None)"""
+        members, presences, _ = self.counts.get(guild.id, (0, 0, None))
+        # The gateway keeps member_count current on joins/leaves, the fetched total can be a minute old
+        total = guild.member_count or members
+
+        return {
+            'total_members': total,  # Includes bots, approximate counts cannot tell them apart
+            'total_bots': None,
+            'total_all': total,
+            'online_members': presences,
+            'status_counts': {'online': None, 'idle': None, 'dnd': None, 'offline': None, 'total_online': presences}
+        }
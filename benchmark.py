@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite
+Times the dashboard's hot operations against synthetic guilds and saves the results as JSON
+
+    python benchmark.py --sizes 100,10000,1000000 --history 10080
+    python benchmark.py --compare benchmark_results/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from config import Config
+from fakes import DEFAULT_STATUS_MIX, make_guild
+from snapshot_columns import SnapshotColumns
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+SNAPSHOT_INTERVAL = 60  # seconds between prefilled history snapshots
+FULL_SCANS = {'BotUtils.get_member_status_counts', 'DashboardCreator.create_embed[cold]'}
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Latency percentiles over ``repeat`` calls plus the peak memory of one traced call"""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'runs': repeat,
+        'mean_ms': round(statistics.fmean(latencies), 4),
+        'p50_ms': round(latencies[len(latencies) // 2], 4),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4),
+        'min_ms': round(latencies[0], 4),
+        'max_ms': round(latencies[-1], 4),
+        'peak_kib': round(peak / 1024, 1)
+    }
+
+def prefill_history(tracker, guild_id: int, snapshots: int, total_members: int, online_members: int):
+    """Load ``snapshots`` minutes of in-memory history ending now, without touching storage"""
+    columns = tracker.get_guild_data(guild_id)["daily_snapshots"]
+    now = datetime.now().timestamp()
+    for i in range(snapshots, 0, -1):
+        ts = now - i * SNAPSHOT_INTERVAL
+        total = total_members - i // 60  # roughly one join per hour
+        columns.append(ts, total, online_members)
+        tracker._add_to_rollups(guild_id, ts, total, online_members)
+
+def snapshot_storage(snapshots: int, repeat: int) -> Dict[str, Any]:
+    """Memory of ``snapshots`` rows of history as dicts vs columns, and a one-hour window query on each"""
+    now = datetime.now().timestamp()
+    rows = [(now - i * SNAPSHOT_INTERVAL, 10_000 - i // 60, 1_000 + i % 50) for i in range(snapshots, 0, -1)]
+
+    tracemalloc.start()
+    dicts = [{
+        'timestamp': datetime.fromtimestamp(ts).isoformat(), 'guild_id': 1, 'total_members': total,
+        'online_members': online, 'date': datetime.fromtimestamp(ts).strftime("%Y-%m-%d"),
+        'hour': datetime.fromtimestamp(ts).hour
+    } for ts, total, online in rows]
+    dicts_kib = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    columns = SnapshotColumns(1)
+    for ts, total, online in rows:
+        columns.append(ts, total, online)
+    columns_kib = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+
+    window_start = now - 3600
+
+    def scan_dicts():
+        since = datetime.fromtimestamp(window_start).isoformat()
+        recent = [d for d in dicts if d['timestamp'] >= since]
+        return sum(d['online_members'] / max(d['total_members'], 1) for d in recent) / max(len(recent), 1)
+
+    def query_columns():
+        return columns.mean_online_ratio(*columns.window(window_start, now))
+
+    return {
+        'snapshots': snapshots,
+        'dicts_kib': round(dicts_kib, 1),
+        'columns_kib': round(columns_kib, 1),
+        'window_query': {'dicts': measure(scan_dicts, repeat), 'columns': measure(query_columns, repeat)}
+    }
+
+def run_size(member_count: int, args) -> Dict[str, Any]:
+    """Benchmark every operation against one synthetic guild"""
+    import web_dashboard
+    from dashboard import DashboardCreator
+
+    guild_id = member_count  # One guild (and state file slot) per size
+    status_mix = json.loads(args.status_mix) if args.status_mix else DEFAULT_STATUS_MIX
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    guild = make_guild(member_count, guild_id=guild_id, status_mix=status_mix,
+                       voice_channels=args.voice_channels, voice_ratio=args.voice_ratio, seed=args.seed)
+    build_ms = (time.perf_counter() - start) * 1000
+    _, fixture_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    dashboard = DashboardCreator(Config("benchmark"))
+    tracker = dashboard.growth_tracker
+    try:
+        status_counts = dashboard.utils.get_member_status_counts(guild)
+        prefill_history(tracker, guild_id, args.history, member_count, status_counts['total_online'])
+        dashboard.mark_chunked(guild.id)  # The fake member cache is complete from the start
+        dashboard.create_embed(guild)  # Seed counters and publish the state file once
+
+        def create_embed_cold():
+            dashboard.presence.invalidate(guild.id)
+            dashboard.voice.invalidate(guild.id)
+            dashboard.create_embed(guild)
+
+        operations = {
+            'BotUtils.get_member_status_counts': lambda: dashboard.utils.get_member_status_counts(guild),
+            'DashboardCreator.create_embed': lambda: dashboard.create_embed(guild),
+            'DashboardCreator.create_embed[cold]': create_embed_cold,
+            'DashboardCreator.render_if_changed': lambda: dashboard.render_if_changed(guild),
+            'GrowthTracker.record_snapshot': lambda: tracker.record_snapshot(guild_id, member_count, 100),
+            'GrowthTracker.calculate_growth_percentage': lambda: tracker.calculate_growth_percentage(guild_id, member_count),
+            'GrowthTracker.get_growth_trend': lambda: tracker.get_growth_trend(guild_id),
+            'GrowthTracker._calculate_activity_based_growth':
+                lambda: tracker._calculate_activity_based_growth(guild_id, member_count),
+            'web_dashboard.get_bot_data': lambda: web_dashboard.get_bot_data(guild_id)
+        }
+
+        results = {}
+        for name, fn in operations.items():
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            # Full scans of the largest guilds are slow; cap their repetitions
+            repeat = args.repeat
+            if name in FULL_SCANS and member_count >= 100_000:
+                repeat = max(3, args.repeat // 5)
+            results[name] = measure(fn, repeat)
+            print(f"  {name:<48} p50 {results[name]['p50_ms']:>10.3f} ms  peak {results[name]['peak_kib']:>10.1f} KiB")
+    finally:
+        dashboard.close()
+
+    return {
+        'members': member_count,
+        'history_snapshots': args.history,
+        'fixture': {'build_ms': round(build_ms, 1), 'peak_kib': round(fixture_peak / 1024, 1)},
+        'operations': results
+    }
+
+def compare(current: Dict, baseline_path: str, threshold: float, min_delta_ms: float) -> List[str]:
+    """Operations whose p50 regressed by more than ``threshold`` (and ``min_delta_ms``) versus a saved run"""
+    with open(baseline_path, 'r') as f:
+        baseline = {run['members']: run['operations'] for run in json.load(f)['runs']}
+
+    regressions = []
+    for run in current['runs']:
+        for name, stats in run['operations'].items():
+            before = baseline.get(run['members'], {}).get(name)
+            if not before or not before['p50_ms']:
+                continue
+            ratio = stats['p50_ms'] / before['p50_ms']
+            if ratio > threshold and stats['p50_ms'] - before['p50_ms'] >= min_delta_ms:
+                regressions.append(f"{name} @ {run['members']:,} members: {before['p50_ms']:.3f} → {stats['p50_ms']:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+def parse_args(argv: Optional[List[str]] = None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark dashboard operations on synthetic guilds")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated member counts")
+    parser.add_argument('--history', type=int, default=int(timedelta(days=7).total_seconds() // SNAPSHOT_INTERVAL),
+                        help="prefilled snapshots per guild (default: 7 days at one per minute)")
+    parser.add_argument('--status-mix', help='JSON status weights, e.g. \'{"online": 0.5, "offline": 0.5}\'')
+    parser.add_argument('--voice-channels', type=int, default=10)
+    parser.add_argument('--voice-ratio', type=float, default=0.01, help="share of members in voice")
+    parser.add_argument('--repeat', type=int, default=20, help="timed calls per operation")
+    parser.add_argument('--only', action='append', help="only run operations whose name contains this")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="result file (default: benchmark_results/<timestamp>.json)")
+    parser.add_argument('--compare', help="earlier result file to check for regressions")
+    parser.add_argument('--threshold', type=float, default=1.5, help="p50 ratio counted as a regression")
+    parser.add_argument('--min-delta-ms', type=float, default=0.1,
+                        help="ignore slowdowns smaller than this (timer noise on sub-millisecond operations)")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite and write the JSON report"""
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    output = os.path.abspath(args.output or os.path.join(
+        "benchmark_results", datetime.now().strftime("%Y%m%dT%H%M%S") + ".json"))
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'args': vars(args),
+        'runs': []
+    }
+
+    storage = report['snapshot_storage'] = snapshot_storage(args.history, args.repeat)
+    print(f"🗃️  {args.history:,} history snapshots: dicts {storage['dicts_kib']:,.1f} KiB, "
+          f"columns {storage['columns_kib']:,.1f} KiB; one-hour window p50 "
+          f"{storage['window_query']['dicts']['p50_ms']:.3f} ms (dicts) vs "
+          f"{storage['window_query']['columns']['p50_ms']:.3f} ms (columns)")
+
+    # Storage, state file and journal all go to a scratch directory
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="paranoia-bench-") as workdir:
+        os.chdir(workdir)
+        try:
+            for size in sizes:
+                print(f"📏 {size:,} members, {args.history:,} history snapshots")
+                report['runs'].append(run_size(size, args))
+        finally:
+            os.chdir(cwd)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results saved to {output}")
+
+    if baseline:
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        for line in regressions:
+            print(f"⚠️  Regression: {line}")
+        if regressions:
+            return 1
+        print("✅ No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,19 +7,33 @@ import discord
 from discord.ext import tasks
 import asyncio
 import logging
-from typing import Optional
+import os
+import signal
+import time
+from typing import Dict, Optional, Set, Tuple
 from config import Config
 from dashboard import DashboardCreator
 from utils import BotUtils
+from update_scheduler import AdaptiveInterval, UpdateScheduler
+from dashboard_target import DashboardTarget
+from message_store import DashboardMessageStore
+from api_server import ApiServer
+from write_queue import TokenBucket, WriteQueue
+from profiling import TickProfiler, stage_timer
+from structured_logging import setup_logging
+from metrics import (DASHBOARD_UPDATES, DASHBOARD_FALLBACKS, DASHBOARD_FIRST_RENDER_SECONDS,
+                     RATE_LIMITS, RATE_LIMIT_WAIT_SECONDS, GATEWAY_EVENTS, WRITE_QUEUE_DEPTH, UPDATE_INTERVAL_SECONDS)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Configure logging: JSON lines written by a background thread (LOG_FORMAT=text for plain lines)
+setup_logging(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    json_format=os.getenv("LOG_FORMAT", "json") != "text",
+    burst=int(os.getenv("LOG_SAMPLE_BURST", "20")),
+    interval=float(os.getenv("LOG_SAMPLE_INTERVAL", "10"))
 )
 logger = logging.getLogger(__name__)
 
-class ParanoiaBot(discord.Client):
+class ParanoiaBot(discord.AutoShardedClient):
     """Main bot class for Paranoia Community Statistics"""
     
     def __init__(self, config: Config):
@@ -28,146 +42,506 @@ class ParanoiaBot(discord.Client):
         for intent_name, enabled in config.intents_config.items():
             setattr(intents, intent_name, enabled)
         
-        super().__init__(intents=intents)
+        # Members are chunked in the background after on_ready (or never, in counts-only mode)
+        cache_options = {'chunk_guilds_at_startup': False}
+        if config.counts_only:
+            # Keep just the members in voice
+            member_cache_flags = discord.MemberCacheFlags.none()
+            member_cache_flags.voice = True
+            cache_options['member_cache_flags'] = member_cache_flags
+        
+        # Long rate limit waits raise discord.RateLimited so the scheduler can back off
+        super().__init__(
+            intents=intents,
+            shard_count=config.shard_count,
+            max_ratelimit_timeout=config.max_ratelimit_timeout,
+            **cache_options
+        )
         
         self.config = config
-        self.dashboard = DashboardCreator(config)
+        self.dashboard = DashboardCreator(config, fetch_guild=self.fetch_guild)
         self.utils = BotUtils()
-        self.target_channel: Optional[discord.TextChannel] = None
-        self.dashboard_message: Optional[discord.Message] = None
+        self.targets: Dict[int, DashboardTarget] = {
+            channel_id: DashboardTarget(channel_id, guild_id)
+            for guild_id, channel_id in config.get_dashboard_targets()
+        }
+        self.guild_targets: Dict[int, DashboardTarget] = {}
+        self.message_store = DashboardMessageStore(config.message_store_file)
         self.is_ready = False
+        # Caps concurrent dashboard renders/HTTP calls across all guilds
+        self._update_slots = asyncio.Semaphore(config.max_concurrent_updates)
+        self.api_server = ApiServer(config.api_host, config.api_port, bot=self) if config.api_port else None
+        self._started_at = time.monotonic()
+        self._first_renders: Set[Tuple[int, str]] = set()  # (guild ID, data source) already rendered once
+        self._chunk_task: Optional[asyncio.Task] = None
+        self.profiler = TickProfiler(config.profile_dir, config.slow_tick_threshold, config.profile_ticks)
+    
+    async def setup_hook(self):
+        """Start the built-in API and the profiling signal handler once, before the gateway connects"""
+        try:
+            # `kill -USR1 <pid>` profiles the next few dashboard ticks
+            self.loop.add_signal_handler(signal.SIGUSR1, self.profiler.request)
+        except (NotImplementedError, AttributeError, RuntimeError):
+            pass  # No SIGUSR1 on this platform or not on the main thread; the admin endpoint still works
+        
+        if self.api_server:
+            try:
+                await self.api_server.start()
+            except OSError as e:
+                logger.error(f"❌ Could not start the built-in API: {e}")
+                self.api_server = None
         
     async def on_ready(self):
         """Called when the bot is ready and connected"""
-        logger.info(f"🤖 Bot logged in as {self.user} (ID: {self.user.id})")
+        logger.info(f"🤖 Bot logged in as {self.user} (ID: {self.user.id}) on {self.shard_count} shard(s)")
         
-        # Find target channel
-        channel = self.get_channel(self.config.channel_id)
-        if not channel:
-            logger.error(f"❌ Could not find channel with ID: {self.config.channel_id}")
+        for target in self.targets.values():
+            self._setup_target(target)
+        
+        if not any(target.is_active for target in self.targets.values()):
+            logger.error("❌ No usable dashboard channel, nothing to do")
             await self.close()
             return
         
+        # Start the dashboard update task
+        if not self.dashboard_update_task.is_running():
+            self.dashboard_update_task.change_interval(seconds=self.config.update_check_interval)
+            self.dashboard_update_task.start()
+            logger.info("🔄 Dashboard update task started")
+        
+        # Dashboards render from last-known stats until their guild's member cache is filled
+        if not self.config.counts_only and (self._chunk_task is None or self._chunk_task.done()):
+            self._chunk_task = asyncio.create_task(self._chunk_guilds(), name="member-chunking")
+        
+        if not self.presence_reconcile_task.is_running() and not self.config.counts_only:
+            self.presence_reconcile_task.change_interval(seconds=self.config.presence_reconcile_interval)
+            self.presence_reconcile_task.start()
+        
+        self.is_ready = True
+        logger.info(f"🚀 Bot is fully operational with {len(self.guild_targets)} dashboard(s)!")
+    
+    def _setup_target(self, target: DashboardTarget) -> bool:
+        """Resolve and validate one dashboard channel; failures only disable that dashboard"""
+        target.disabled_reason = None
+        
+        # Find target channel
+        channel = self.get_channel(target.channel_id)
+        if not channel:
+            target.disable(f"could not find channel with ID {target.channel_id}")
+            return False
+        
         if not isinstance(channel, discord.TextChannel):
-            logger.error(f"❌ Channel {self.config.channel_id} is not a text channel")
-            await self.close()
-            return
+            target.disable(f"channel {target.channel_id} is not a text channel")
+            return False
         
-        self.target_channel = channel
+        if target.guild_id is not None and channel.guild.id != target.guild_id:
+            target.disable(f"channel {target.channel_id} does not belong to guild {target.guild_id}")
+            return False
+        
+        target.channel = channel
+        target.guild_id = channel.guild.id
+        self.guild_targets[channel.guild.id] = target
+        # The member cache is rebuilt when the session is re-identified
+        self.dashboard.presence.invalidate(channel.guild.id)
+        self.dashboard.voice.invalidate(channel.guild.id)
+        self.dashboard.mark_chunked(channel.guild.id, False)
         logger.info(f"📋 Target channel found: #{channel.name} in {channel.guild.name}")
         
-        # Check permissions
+        if not self._check_permissions(target):
+            return False
+        
+        if target.scheduler is None:
+            target.scheduler = UpdateScheduler(
+                lambda: self.update_dashboard(target),
+                min_interval=self.config.dashboard_min_interval,
+                max_staleness=self.config.dashboard_max_staleness,
+                debounce=self.config.dashboard_debounce
+            )
+        target.scheduler.start()
+        
+        if target.refresh is None:
+            target.refresh = AdaptiveInterval(
+                self.config.update_interval,
+                self.config.update_interval_min,
+                self.config.update_interval_max,
+                self.config.update_busy_rate
+            )
+            UPDATE_INTERVAL_SECONDS.set_function(lambda: target.refresh.interval, channel=target.channel_id)
+        
+        if target.writes is None:
+            target.writes = WriteQueue(
+                f"#{channel.name}",
+                TokenBucket(self.config.write_bucket_capacity, self.config.write_bucket_period),
+                max_retries=self.config.write_max_retries,
+                backoff_base=self.config.write_backoff_base,
+                backoff_max=self.config.write_backoff_max,
+                on_rate_limit=lambda retry_after, source: self._on_rate_limit(target, retry_after, source)
+            )
+            WRITE_QUEUE_DEPTH.set_function(target.writes.depth, channel=target.channel_id)
+        target.writes.start()
+        return True
+    
+    async def _chunk_guilds(self):
+        """Fill the member cache of dashboard guilds one by one, then switch them to live counts"""
+        for target in list(self.guild_targets.values()):
+            await self._chunk_guild(target)
+    
+    async def _chunk_guild(self, target: DashboardTarget):
+        """Fill one dashboard guild's member cache unless that already happened since the last connect"""
+        guild = target.guild
+        if not target.is_active or guild.id in self.dashboard.chunked_guilds:
+            return
+        
+        started = time.monotonic()
+        if not guild.chunked:
+            try:
+                await guild.chunk(cache=True)
+            except Exception as e:
+                logger.error(f"❌ Could not load the members of {guild.name}: {e}")
+                return
+        
+        # Seed the counters from the complete cache on the next render
+        self.dashboard.presence.invalidate(guild.id)
+        self.dashboard.voice.invalidate(guild.id)
+        self.dashboard.mark_chunked(guild.id)
+        logger.info(f"👥 Loaded {guild.member_count:,} members of {guild.name} in {time.monotonic() - started:.1f}s, switching to live counts")
+        target.mark_dirty("chunked")
+    
+    async def on_guild_unavailable(self, guild):
+        """An outage drops the guild's member cache; show last-known stats until it is refilled"""
+        if guild.id in self.guild_targets:
+            self.dashboard.mark_chunked(guild.id, False)
+    
+    async def on_guild_available(self, guild):
+        """Refill the member cache of a dashboard guild that came back after an outage"""
+        target = self.guild_targets.get(guild.id)
+        if target and self.is_ready and not self.config.counts_only:
+            asyncio.create_task(self._chunk_guild(target), name=f"member-chunking-{guild.id}")
+    
+    def _check_permissions(self, target: DashboardTarget) -> bool:
+        """Verify channel permissions, reusing the last successful check across reconnects"""
+        if target.permissions_ok:
+            return True
+        
+        channel = target.channel
         permissions = channel.permissions_for(channel.guild.me)
         required_perms = ['send_messages', 'embed_links', 'read_message_history']
         missing_perms = [perm for perm in required_perms if not getattr(permissions, perm)]
         
         if missing_perms:
-            logger.error(f"❌ Missing permissions: {', '.join(missing_perms)}")
-            await self.close()
-            return
-        
-        logger.info("✅ All required permissions granted")
+            target.disable(f"missing permissions in {channel.guild.name}: {', '.join(missing_perms)}")
+            return False
         
-        # Start the dashboard update task
-        if not self.dashboard_update_task.is_running():
-            self.dashboard_update_task.start()
-            logger.info("🔄 Dashboard update task started")
+        target.permissions_ok = True
+        logger.info(f"✅ All required permissions granted in {channel.guild.name}")
+        return True
+    
+    def _recheck_target(self, target: DashboardTarget):
+        """Re-run the permission check after a permission-relevant change, keeping the member counters"""
+        target.permissions_ok = False
+        if not self.is_ready or target.channel is None:
+            return
+        if target.scheduler is None or target.writes is None:
+            # Setup stopped at the permission check, so nothing is running or counted yet
+            self._setup_target(target)
+            return
+        if not self._check_permissions(target) or target.disabled_reason is None:
+            return
         
-        self.is_ready = True
-        logger.info("🚀 Bot is fully operational!")
+        # Permissions were granted again: resume the dashboard that the failed check stopped
+        target.disabled_reason = None
+        target.scheduler.start()
+        target.writes.start()
+        target.mark_dirty("permissions")
+        if not self.config.counts_only:
+            asyncio.create_task(self._chunk_guild(target), name=f"member-chunking-{target.guild_id}")
+    
+    async def on_guild_channel_update(self, before, after):
+        """Re-check permissions when a dashboard channel's overwrites change"""
+        target = self.targets.get(after.id)
+        if target and before.overwrites != after.overwrites:
+            self._recheck_target(target)
+    
+    async def on_guild_role_update(self, before, after):
+        """Re-check permissions when a role in a dashboard guild changes"""
+        target = self.guild_targets.get(after.guild.id)
+        if target and before.permissions != after.permissions:
+            self._recheck_target(target)
+    
+    async def on_socket_event_type(self, event_type):
+        """Count gateway events per type for throughput metrics"""
+        GATEWAY_EVENTS.inc(event=event_type)
     
     async def on_error(self, event, *args, **kwargs):
         """Handle errors"""
         logger.error(f"❌ Error in event {event}: {args}")
     
-    @tasks.loop(seconds=60)  # Update every minute
+    @tasks.loop(seconds=10)  # Interval replaced by config.update_check_interval on start
     async def dashboard_update_task(self):
-        """Main task that updates the dashboard every minute"""
-        if not self.is_ready or not self.target_channel:
-            return
+        """Main task that schedules a refresh of every dashboard whose adaptive interval has passed"""
+        now = time.monotonic()
+        for target in self.guild_targets.values():
+            if target.refresh is None or target.refresh.is_due(now):
+                target.mark_dirty("interval")
+    
+    async def update_dashboard(self, target: DashboardTarget) -> bool:
+        """Render one guild's dashboard and queue its send or edit; returns False if nothing was queued"""
+        if not self.is_ready or not target.is_active:
+            return False
         
+        async with self._update_slots:
+            with self.profiler.tick("dashboard_update", target.guild.name):
+                return await self._update_dashboard(target)
+    
+    async def _update_dashboard(self, target: DashboardTarget) -> bool:
+        """Render a dashboard and queue its delivery while holding an update slot"""
+        observed = False
         try:
-            guild = self.target_channel.guild
+            guild = target.guild
             logger.info(f"🔄 Updating dashboard for {guild.name}")
             
-            # Create new dashboard embed
-            embed = self.dashboard.create_embed(guild)
+            if target.message is None and not target.restored:
+                with stage_timer("restore"):
+                    await self._restore_message(target)
             
-            if self.dashboard_message is None:
-                # Send new message if none exists
-                self.dashboard_message = await self.target_channel.send(embed=embed)
-                logger.info("📤 New dashboard message sent")
-            else:
-                try:
-                    # Try to edit existing message
-                    await self.dashboard_message.edit(embed=embed)
-                    logger.info("✏️  Dashboard message updated")
-                except discord.NotFound:
-                    # Message was deleted, send a new one
-                    self.dashboard_message = await self.target_channel.send(embed=embed)
-                    logger.info("📤 Dashboard message recreated (original was deleted)")
-                except discord.HTTPException as e:
-                    logger.warning(f"⚠️  Could not edit message: {e}")
-                    # Try sending a new message as fallback
-                    self.dashboard_message = await self.target_channel.send(embed=embed)
-                    logger.info("📤 New dashboard message sent as fallback")
-        
-        except discord.Forbidden:
-            logger.error("❌ Missing permissions to send/edit messages")
-            self.dashboard_update_task.stop()
+            await self.dashboard.prepare(guild)
+            
+            # Create new dashboard embed, unless nothing visible changed
+            embed = self.dashboard.render_if_changed(guild, force=target.message is None)
+            self._observe_activity(target)
+            observed = True
+            if embed is None:
+                logger.info(f"💤 Dashboard for {guild.name} unchanged, skipping edit")
+                DASHBOARD_UPDATES.inc(result="unchanged")
+                return False
+            
+            # Queue the write; a newer render replaces it if it has not gone out yet
+            digest = self.dashboard.pending_digest(guild.id)
+            source = "last_known" if self.dashboard.is_warming_up(guild) else "live"
+            target.writes.submit(
+                "dashboard", lambda: self._deliver(target, embed),
+                lambda error: self._on_dashboard_written(target, digest, source, error)
+            )
+            return True
+        
+        except discord.RateLimited as e:
+            self._retry_after_rate_limit(target, e.retry_after, "client_timeout")
         except discord.HTTPException as e:
-            logger.error(f"❌ HTTP error during dashboard update: {e}")
+            if e.status == 429:
+                self._retry_after_rate_limit(target, float(e.response.headers.get('Retry-After', 5)), "http_429")
+            else:
+                self._on_write_error(target, e)
         except Exception as e:
-            logger.error(f"❌ Unexpected error during dashboard update: {e}")
-            # Send error embed
+            self._on_write_error(target, e)
+        finally:
+            if not observed and target.refresh is not None:
+                # Without this a failing render stays due and retries (and reports) on every check
+                interval = target.refresh.failed(time.monotonic())
+                logger.warning(f"⏲️  Dashboard update for channel {target.channel_id} failed "
+                               f"{target.refresh.failures} time(s) in a row, next attempt in {interval:.0f}s")
+        return False
+    
+    def _observe_activity(self, target: DashboardTarget):
+        """Feed the stats the render just collected into the dashboard's adaptive refresh interval"""
+        if target.refresh is None:
+            return
+        stats = self.dashboard.collected_stats.get(target.guild_id, ())
+        previous = target.refresh.interval
+        interval = target.refresh.observe(stats, time.monotonic())
+        if interval != previous:
+            logger.debug(f"⏲️  Refresh interval for {target.guild.name}: {previous:.0f}s → {interval:.0f}s")
+    
+    def _on_dashboard_written(self, target: DashboardTarget, digest: Optional[str], source: str,
+                              error: Optional[BaseException]):
+        """Outcome of a queued dashboard write"""
+        if error is None:
+            self.dashboard.mark_sent(target.guild_id, digest)
+            self._record_first_render(target.guild, source)
+            DASHBOARD_UPDATES.inc(result="sent")
+        else:
+            self._on_write_error(target, error)
+    
+    def _on_write_error(self, target: DashboardTarget, error: BaseException):
+        """Disable the dashboard on missing permissions, report anything else in the channel"""
+        if isinstance(error, discord.Forbidden):
+            DASHBOARD_UPDATES.inc(result="forbidden")
+            target.permissions_ok = False
+            target.disable("missing permissions to send/edit messages")
+        elif isinstance(error, discord.HTTPException):
+            DASHBOARD_UPDATES.inc(result="http_error")
+            logger.error(f"❌ HTTP error during dashboard update: {error}")
+        else:
+            DASHBOARD_UPDATES.inc(result="error")
+            logger.error(f"❌ Unexpected error during dashboard update: {error}")
+            # Send error embed through the same paced queue; errors while sending it are ignored
             try:
-                error_embed = self.dashboard.create_error_embed(str(e))
-                await self.target_channel.send(embed=error_embed)
-            except:
-                pass  # Ignore errors when sending error message
+                error_embed = self.dashboard.create_error_embed(str(error))
+                target.writes.submit("error", lambda: target.channel.send(embed=error_embed))
+            except Exception as e:
+                logger.warning(f"⚠️  Could not queue the error embed: {e}")
+    
+    async def _deliver(self, target: DashboardTarget, embed: discord.Embed):
+        """Time one queued dashboard write"""
+        with self.profiler.tick("dashboard_write", target.guild.name, counted=False), stage_timer("send"):
+            await self._send_or_edit(target, embed)
+    
+    async def _send_or_edit(self, target: DashboardTarget, embed: discord.Embed):
+        """Edit the dashboard message, or send a new one when there is none or it is gone"""
+        if target.message is None:
+            # Send new message if none exists
+            self._remember_message(target, await target.channel.send(embed=embed))
+            logger.info("📤 New dashboard message sent")
+            return
+        
+        try:
+            # Try to edit existing message
+            await target.message.edit(embed=embed)
+            logger.info("✏️  Dashboard message updated")
+        except discord.NotFound:
+            # Message was deleted, send a new one
+            DASHBOARD_FALLBACKS.inc(reason="not_found")
+            await target.writes.bucket.acquire()  # The fallback send is a second write
+            self._remember_message(target, await target.channel.send(embed=embed))
+            logger.info("📤 Dashboard message recreated (original was deleted)")
+        except discord.HTTPException as e:
+            if e.status == 429:
+                raise  # Sending a new message would only hit the limit again
+            DASHBOARD_FALLBACKS.inc(reason="http_error")
+            logger.warning(f"⚠️  Could not edit message: {e}")
+            # Try sending a new message as fallback
+            await target.writes.bucket.acquire()
+            self._remember_message(target, await target.channel.send(embed=embed))
+            logger.info("📤 New dashboard message sent as fallback")
+    
+    async def _restore_message(self, target: DashboardTarget):
+        """Find the existing dashboard message so a restart edits it instead of posting again"""
+        target.restored = True
+        channel = target.channel
+        
+        message_id = self.message_store.get_message_id(channel.id)
+        if message_id:
+            try:
+                target.message = await channel.fetch_message(message_id)
+                logger.info(f"♻️  Reusing dashboard message {message_id} in #{channel.name}")
+                return
+            except discord.NotFound:
+                self.message_store.forget(channel.id)
+            except discord.HTTPException as e:
+                logger.warning(f"⚠️  Could not fetch stored dashboard message: {e}")
+        
+        # Fall back to our own most recent dashboard in the channel history
+        try:
+            async for message in channel.history(limit=self.config.dashboard_history_search_limit):
+                if message.author.id == self.user.id and self.dashboard.is_dashboard_embed(message.embeds):
+                    self._remember_message(target, message)
+                    logger.info(f"♻️  Found previous dashboard message {message.id} in #{channel.name}")
+                    return
+        except discord.HTTPException as e:
+            logger.warning(f"⚠️  Could not search channel history: {e}")
+    
+    def _remember_message(self, target: DashboardTarget, message: discord.Message):
+        """Track and persist the dashboard message of a target"""
+        target.message = message
+        self.message_store.set_message_id(target.channel_id, message.id)
+    
+    def _retry_after_rate_limit(self, target: DashboardTarget, retry_after: float, source: str):
+        """Push the next render past Discord's Retry-After and keep it pending"""
+        self._on_rate_limit(target, retry_after, source)
+        target.mark_dirty("rate_limit_retry")
+    
+    def _on_rate_limit(self, target: DashboardTarget, retry_after: float, source: str):
+        """Record a rate limit and hold off renders while it lasts (the write queue retries on its own)"""
+        DASHBOARD_UPDATES.inc(result="rate_limited")
+        RATE_LIMITS.inc(source=source)
+        RATE_LIMIT_WAIT_SECONDS.observe(retry_after)
+        target.scheduler.defer(retry_after)
+    
+    def _record_first_render(self, guild: discord.Guild, source: str):
+        """Time to the first delivered dashboard per guild, from last-known and from live data"""
+        if (guild.id, source) in self._first_renders:
+            return
+        self._first_renders.add((guild.id, source))
+        elapsed = time.monotonic() - self._started_at
+        DASHBOARD_FIRST_RENDER_SECONDS.set(round(elapsed, 3), guild=guild.id, source=source)
+        logger.info(f"⏱️  First {source.replace('_', '-')} dashboard for {guild.name} after {elapsed:.1f}s")
+    
+    def _mark_guild_dirty(self, guild: discord.Guild, reason: str):
+        """Request a render of the dashboard that covers a guild, if any"""
+        target = self.guild_targets.get(guild.id)
+        if target:
+            target.mark_dirty(reason)
     
     @dashboard_update_task.before_loop
     async def before_dashboard_update(self):
         """Wait until bot is ready before starting the task"""
         await self.wait_until_ready()
-        # Wait a bit more to ensure everything is properly initialized
-        await asyncio.sleep(2)
+    
+    @tasks.loop(minutes=15)
+    async def presence_reconcile_task(self):
+        """Periodically rescan members to catch drift in the incremental counters"""
+        if not self.is_ready:
+            return
+        for target in self.guild_targets.values():
+            if target.is_active and not self.dashboard.is_warming_up(target.guild):
+                self.dashboard.presence.reconcile(target.guild)
+    
+    @presence_reconcile_task.before_loop
+    async def before_presence_reconcile(self):
+        """Skip the immediate first run, the counters were just seeded"""
+        await self.wait_until_ready()
+        await asyncio.sleep(self.config.presence_reconcile_interval)
     
     async def on_member_join(self, member):
         """Handle member join events"""
-        logger.info(f"👋 Member joined: {member.name}")
-        # Trigger immediate update when member count changes
-        if self.dashboard_update_task.is_running():
-            self.dashboard_update_task.restart()
+        self.dashboard.presence.on_member_join(member)
+        # Lazy %-formatting; raids are sampled per event type by the logging setup
+        logger.info("👋 Member joined: %s", member.name, extra={'event': 'member_join', 'guild_id': member.guild.id})
+        # Member count changed, bursts are merged into a single render
+        self._mark_guild_dirty(member.guild, "member_join")
     
     async def on_member_remove(self, member):
         """Handle member leave events"""
-        logger.info(f"👋 Member left: {member.name}")
-        # Trigger immediate update when member count changes
-        if self.dashboard_update_task.is_running():
-            self.dashboard_update_task.restart()
+        self.dashboard.presence.on_member_remove(member)
+        logger.info("👋 Member left: %s", member.name, extra={'event': 'member_remove', 'guild_id': member.guild.id})
+        # Member count changed, bursts are merged into a single render
+        self._mark_guild_dirty(member.guild, "member_remove")
     
     async def on_voice_state_update(self, member, before, after):
         """Handle voice state changes"""
+        self.dashboard.voice.on_voice_state_update(member, before, after)
         # Only update if someone joins or leaves voice (not just mute/deafen)
         if (before.channel is None) != (after.channel is None):
-            logger.info(f"🎙️  Voice state change: {member.name}")
-            # Small delay to avoid too frequent updates
-            await asyncio.sleep(5)
-            if self.dashboard_update_task.is_running():
-                self.dashboard_update_task.restart()
-    
-    async def on_member_update(self, before, after):
-        """Handle member status updates"""
-        # Only update if status changed
+            logger.info("🎙️  Voice state change: %s", member.name,
+                        extra={'event': 'voice_state_update', 'guild_id': member.guild.id})
+            # The scheduler's debounce replaces the old per-event sleep
+            self._mark_guild_dirty(member.guild, "voice")
+    
+    async def on_presence_update(self, before, after):
+        """Handle status changes (discord.py 2.x delivers them only as presence updates)"""
         if before.status != after.status:
-            logger.debug(f"📊 Status change: {after.name} - {before.status} → {after.status}")
-            # Don't restart task for every status change to avoid rate limits
-            # The regular 1-minute update will catch these changes
+            logger.debug("📊 Status change: %s - %s → %s", after.name, before.status, after.status,
+                         extra={'event': 'status_change', 'guild_id': after.guild.id})
+            self.dashboard.presence.on_status_change(before, after)
+            # No render per status change; the adaptive periodic refresh picks these up
     
     async def close(self):
         """Clean shutdown"""
         logger.info("🛑 Bot shutting down...")
+        for target in self.targets.values():
+            if target.scheduler:
+                logger.info(f"📊 Scheduler stats for channel {target.channel_id}: {target.scheduler.get_stats()}")
+                target.scheduler.stop()
+            if target.writes:
+                logger.info(f"📮 Write queue stats for channel {target.channel_id}: {target.writes.get_stats()}")
+                target.writes.stop()
+        if self._chunk_task:
+            self._chunk_task.cancel()
         if self.dashboard_update_task.is_running():
             self.dashboard_update_task.stop()
+        if self.presence_reconcile_task.is_running():
+            self.presence_reconcile_task.stop()
+        if self.api_server:
+            await self.api_server.stop()
+        # Drain the background snapshot writer without blocking the event loop
+        await asyncio.to_thread(self.dashboard.close)
         await super().close()
@@ -3,18 +3,72 @@ Configuration settings for the Paranoia Community Bot
 """
 
 import os
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 class Config:
     """Configuration class for bot settings"""
     
-    def __init__(self, bot_token: str, channel_id: int):
+    def __init__(self, bot_token: str, channel_id: Optional[int] = None,
+                 dashboard_channels: Optional[Dict[int, int]] = None):
         self.bot_token = bot_token
         self.channel_id = channel_id
+        # Multi-guild mode: guild ID -> dashboard channel ID
+        self.dashboard_channels = dict(dashboard_channels or {})
         
         # Bot settings
         self.bot_name = "Paranoia Community Bot"
+        # Adaptive refresh: starts at update_interval, backs off to update_interval_max while stats are stable
+        # and tightens toward update_interval_min while they change faster than update_busy_rate per minute
         self.update_interval = 60  # seconds
+        self.update_interval_min = int(os.getenv("UPDATE_INTERVAL_MIN", "20"))
+        self.update_interval_max = int(os.getenv("UPDATE_INTERVAL_MAX", "300"))
+        self.update_busy_rate = 5.0  # summed changes of total/online/voice/boosts per minute
+        self.update_check_interval = 10  # seconds between checks for due dashboards
+        self.presence_reconcile_interval = 900  # seconds between full member rescans
+        
+        # Dashboard render pacing
+        self.dashboard_min_interval = 10  # seconds between two edits
+        self.dashboard_max_staleness = 30  # seconds a pending change may wait
+        self.dashboard_debounce = 3  # seconds of quiet before a burst is rendered
+        self.footer_refresh_interval = 900  # seconds before an unchanged dashboard is re-sent anyway
+        self.write_bucket_capacity = 5  # writes per channel per write_bucket_period (Discord's per-channel message limit)
+        self.write_bucket_period = 5.0
+        self.write_max_retries = 5  # retries of a rate-limited or failed write before it is given up
+        self.write_backoff_base = 1.0  # seconds, doubled per retry with full jitter
+        self.write_backoff_max = 60.0
+        self.max_ratelimit_timeout = 30.0  # longer waits raise instead of blocking (30 is the minimum)
+        
+        # Counts-only mode: approximate totals from the API, no member/presence cache
+        self.counts_only = os.getenv("COUNTS_ONLY", "").lower() in ("1", "true", "yes")
+        self.approximate_counts_ttl = 60  # seconds fetched counts are reused
+        
+        # Multi-guild fleet settings
+        self.shard_count: Optional[int] = None  # None lets Discord pick the shard count
+        self.max_concurrent_updates = 4  # dashboards rendered/sent at the same time
+        
+        # Snapshot storage: "jsonl" (segmented journal) or "sqlite" (WAL database)
+        self.storage_backend = os.getenv("GROWTH_STORAGE", "jsonl")
+        self.storage_db_path = "growth_data.db"
+        self.storage_log_dir = "growth_log"  # journal directory with the jsonl backend
+        self.storage_batch_size = 1  # rows per INSERT batch with the sqlite backend
+        self.writer_batch_size = 100  # snapshots per background flush
+        self.writer_flush_interval = 2.0  # seconds a snapshot may wait in the writer queue
+        self.state_file = "latest_state.bin"  # memory-mapped latest stats read by the web dashboard
+        self.heatmap_file = "activity_heatmap.json"  # hour-of-week activity sums, saved hourly
+        
+        # Tick profiling: slower ticks are logged per stage; captures are started with SIGUSR1 or /admin/profile
+        self.slow_tick_threshold = float(os.getenv("SLOW_TICK_SECONDS", "1.0"))
+        self.profile_ticks = 10  # ticks recorded per capture
+        self.profile_dir = "profiles"
+        self.admin_token = os.getenv("ADMIN_TOKEN")  # enables the /admin/* API routes
+        
+        # Built-in HTTP API on the bot's event loop (/metrics and the live /api/*); port 0 disables it
+        self.api_host = os.getenv("API_HOST", "0.0.0.0")
+        self.api_port = int(os.getenv("API_PORT", "9108"))
+        
+        # Dashboard message persistence (reused across restarts)
+        self.message_store_file = "dashboard_messages.json"
+        self.dashboard_history_search_limit = 50  # recent messages searched for an old dashboard
         self.progress_percentage = 75  # Fixed progress percentage
         
         # Modern 2025 color scheme - Clean & Contemporary
@@ -24,6 +78,7 @@ class Config:
             'accent': 0x00D9FF,       # Modern Cyan
             'success': 0x23A55A,      # Modern Green
             'warning': 0xF0B132,      # Modern Yellow
+            'danger': 0xF23F43,       # Modern Red
             'gradient_start': 0x5865F2, # Discord Blurple
             'gradient_end': 0x00D9FF   # Modern Cyan
         }
@@ -35,18 +90,37 @@ class Config:
         
         # Message settings
         self.message_title = "Paranoia Community Update"
-        self.footer_text = "Live Server Dashboard • Updates every minute"
+        self.footer_text = "Live Server Dashboard • Updates adapt to activity"
         
         # Bot intents (required for member and presence data)
         self.intents_config = {
             'guilds': True,
             'members': True,
-            'presences': True,
+            'presences': not self.counts_only,  # approximate presence counts need no intent
             'voice_states': True,
             'guild_messages': True,
             'message_content': True
         }
     
+    def get_dashboard_targets(self) -> List[Tuple[Optional[int], int]]:
+        """List (guild ID, channel ID) pairs; the guild is None for the single channel_id"""
+        targets: List[Tuple[Optional[int], int]] = list(self.dashboard_channels.items())
+        if self.channel_id and self.channel_id not in self.dashboard_channels.values():
+            targets.append((None, self.channel_id))
+        return targets
+    
+    @staticmethod
+    def parse_dashboard_channels(value: str) -> Dict[int, int]:
+        """Parse 'guild_id:channel_id,guild_id:channel_id' into a mapping"""
+        mapping = {}
+        for pair in value.split(','):
+            pair = pair.strip().strip('"').strip("'")
+            if not pair:
+                continue
+            guild_id, _, channel_id = pair.partition(':')
+            mapping[int(guild_id.strip())] = int(channel_id.strip())
+        return mapping
+    
     def get_progress_bar(self, percentage: Optional[int] = None) -> str:
         """Generate a progress bar string"""
         if percentage is None:
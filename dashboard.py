@@ -3,63 +3,218 @@ Dashboard creation and formatting for the Discord bot
 """
 
 import discord
+import hashlib
+import json
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set, Tuple
 from utils import BotUtils
 from config import Config
 from growth_tracker import GrowthTracker
+from presence_counter import PresenceTracker
+from voice_index import VoiceTracker
+from state_file import LatestStateWriter
+from approximate_counts import ApproximateCounts
+from persistence import SnapshotWriter
+from metrics import SNAPSHOT_WRITER
+from profiling import stage_timer
+
+class RenderCache:
+    """Last delivered render of one guild's dashboard"""
+    
+    def __init__(self):
+        self.digest: Optional[str] = None
+        self.pending_digest: Optional[str] = None
+        self.sent_at = datetime.min
+        self._icon_key: Optional[str] = None
+        self._icon_url: Optional[str] = None
+    
+    def get_icon_url(self, guild: discord.Guild) -> Optional[str]:
+        """Guild icon URL, rebuilt only when the icon itself changes"""
+        icon_key = guild.icon.key if guild.icon else None
+        if icon_key != self._icon_key:
+            self._icon_key = icon_key
+            self._icon_url = guild.icon.url if guild.icon else None
+        return self._icon_url
 
 class DashboardCreator:
     """Creates and formats the server dashboard embed"""
     
-    def __init__(self, config: Config):
+    TITLE_PREFIX = "⚡ Paranoia Community Live Dashboard"
+    
+    def __init__(self, config: Config, fetch_guild: Optional[Callable[..., Awaitable[discord.Guild]]] = None):
         self.config = config
         self.utils = BotUtils()
-        self.growth_tracker = GrowthTracker()
+        self.growth_tracker = GrowthTracker(
+            storage=config.storage_backend,
+            log_dir=config.storage_log_dir,
+            db_path=config.storage_db_path,
+            batch_size=config.storage_batch_size,
+            writer=SnapshotWriter(config.writer_batch_size, config.writer_flush_interval),
+            heatmap_file=config.heatmap_file
+        )
+        writer = self.growth_tracker.writer
+        SNAPSHOT_WRITER.set_function(writer.pending, value="pending")
+        SNAPSHOT_WRITER.set_function(lambda: writer.written, value="written")
+        SNAPSHOT_WRITER.set_function(lambda: writer.errors, value="errors")
+        self.presence = PresenceTracker()
+        self.voice = VoiceTracker()
+        # Counts-only mode reads totals from the API instead of the (disabled) member/presence cache
+        self.approximate_counts = (
+            ApproximateCounts(fetch_guild, config.approximate_counts_ttl)
+            if config.counts_only and fetch_guild else None
+        )
+        self._render_cache: Dict[int, RenderCache] = {}
+        self.chunked_guilds: Set[int] = set()  # Guilds whose member cache was filled since the last (re)connect
+        self.collected_stats: Dict[int, Tuple[Optional[int], ...]] = {}  # guild ID -> stats of the last render
+        self.state_writer = LatestStateWriter(config.state_file)
+    
+    async def prepare(self, guild: discord.Guild):
+        """Refresh data sources that need an API call before a render (no-op with the member cache)"""
+        if self.approximate_counts:
+            with stage_timer("prepare"):
+                await self.approximate_counts.refresh(guild)
     
     def create_embed(self, guild: discord.Guild) -> discord.Embed:
         """Create a comprehensive server statistics embed"""
+        state = self._collect_state(guild)
+        with stage_timer("build"):
+            return self._build_embed(guild, state)
+    
+    def render_if_changed(self, guild: discord.Guild, force: bool = False) -> Optional[discord.Embed]:
+        """Build the embed only if its content differs from the last one sent"""
+        state = self._collect_state(guild)
+        with stage_timer("build"):
+            return self._build_if_changed(guild, state, force)
+    
+    def _build_if_changed(self, guild: discord.Guild, state: Dict[str, Any], force: bool) -> Optional[discord.Embed]:
+        """Compare the state digest with the last delivered one and build the embed if needed"""
+        digest = self._hash_state(state)
+        
+        cache = self._render_cache.get(guild.id)
+        if cache is None:
+            cache = RenderCache()
+            self._render_cache[guild.id] = cache
+        
+        footer_stale = (datetime.now() - cache.sent_at).total_seconds() >= self.config.footer_refresh_interval
+        if not force and digest == cache.digest and not footer_stale:
+            return None
+        
+        cache.pending_digest = digest
+        return self._build_embed(guild, state, cache)
+    
+    def is_dashboard_embed(self, embeds: List[discord.Embed]) -> bool:
+        """Check whether a message's embeds are one of our dashboards"""
+        return any(embed.title and embed.title.startswith(self.TITLE_PREFIX) for embed in embeds)
+    
+    def pending_digest(self, guild_id: int) -> Optional[str]:
+        """Digest of the most recently built, not yet delivered embed"""
+        cache = self._render_cache.get(guild_id)
+        return cache.pending_digest if cache else None
+    
+    def mark_sent(self, guild_id: int, digest: Optional[str] = None):
+        """Remember the digest of the embed that was just delivered (default: the last one built)"""
+        cache = self._render_cache.get(guild_id)
+        digest = digest or (cache.pending_digest if cache else None)
+        if cache and digest:
+            cache.digest = digest
+            if cache.pending_digest == digest:
+                cache.pending_digest = None
+            cache.sent_at = datetime.now()
+    
+    def mark_chunked(self, guild_id: int, chunked: bool = True):
+        """Record that a guild's member cache was filled (or was dropped and must be filled again)"""
+        if chunked:
+            self.chunked_guilds.add(guild_id)
+        else:
+            self.chunked_guilds.discard(guild_id)
+    
+    def is_warming_up(self, guild: discord.Guild) -> bool:
+        """Whether the member cache is still being filled, so live counts would be incomplete"""
+        # Not guild.chunked: it turns False whenever joins/leaves make member_count and the cache drift
+        return self.approximate_counts is None and guild.id not in self.chunked_guilds
+    
+    def _collect_state(self, guild: discord.Guild) -> Dict[str, Any]:
+        """Gather the fields that change between renders (no timestamps)"""
+        warming_up = self.is_warming_up(guild)
         
         # Get all server statistics
-        member_stats = self._get_member_statistics(guild)
-        voice_stats = self._get_voice_statistics(guild)
-        boost_stats = self._get_boost_statistics(guild)
+        with stage_timer("collect"):
+            member_stats = self._get_member_statistics(guild)
+            voice_stats = self._get_voice_statistics(guild)
+            boost_stats = self._get_boost_statistics(guild)
+        self.collected_stats[guild.id] = (
+            member_stats['total_members'], member_stats['online_members'],
+            voice_stats['members_in_voice'], boost_stats['boost_count']
+        )
+        
+        # Record current data and calculate real growth percentage (last-known stats are not new data)
+        if not warming_up:
+            with stage_timer("persist"):
+                self.growth_tracker.record_snapshot(guild.id, member_stats['total_members'], member_stats['online_members'])
+                self.state_writer.publish(
+                    guild.id, member_stats['total_members'], member_stats['online_members'],
+                    voice_stats['members_in_voice'], boost_stats['boost_count']
+                )
+        with stage_timer("growth"):
+            growth_percentage = self.growth_tracker.calculate_growth_percentage(guild.id, member_stats['total_members'])
+            growth_trend = self.growth_tracker.get_growth_trend(guild.id)
+        
+        activity_indicator = "🔥" if member_stats['online_members'] > 5 else "⚡" if member_stats['online_members'] > 2 else "💤"
+        server_pulse = "🟢 Server Online" if member_stats['online_members'] > 0 else "🔴 Server Quiet"
+        
+        if warming_up:
+            server_pulse = "⏳ Warming up, showing last known stats"
+        
+        return {
+            'title': f"{self.TITLE_PREFIX} {activity_indicator}",
+            'description': f"**{guild.name}** • {'Warming up' if warming_up else 'Real-time metrics'} • {growth_percentage}% server growth {growth_trend}",
+            'content': self._create_dashboard_layout(member_stats, voice_stats, boost_stats),
+            'heatmap': self.growth_tracker.get_heatmap(guild.id).render_block(),
+            'server_pulse': server_pulse
+        }
+    
+    @staticmethod
+    def _hash_state(state: Dict[str, Any]) -> str:
+        """Canonical hash of the changing fields"""
+        canonical = json.dumps(state, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+    
+    def _build_embed(self, guild: discord.Guild, state: Dict[str, Any],
+                     cache: Optional["RenderCache"] = None) -> discord.Embed:
+        """Assemble the embed from collected state and cached static parts"""
+        icon_url = cache.get_icon_url(guild) if cache else (guild.icon.url if guild.icon else None)
         
         # Create modern embed with clean theme
         embed = discord.Embed(
+            title=state['title'],
+            description=state['description'],
             color=self.config.embed_colors['primary'],
             timestamp=datetime.now()
         )
         
-        # Record current data and calculate real growth percentage
-        self.growth_tracker.record_snapshot(guild.id, member_stats['total_members'], member_stats['online_members'])
-        growth_percentage = self.growth_tracker.calculate_growth_percentage(member_stats['total_members'])
-        growth_trend = self.growth_tracker.get_growth_trend()
-        
-        activity_indicator = "🔥" if member_stats['online_members'] > 5 else "⚡" if member_stats['online_members'] > 2 else "💤"
-        embed.title = f"⚡ Paranoia Community Live Dashboard {activity_indicator}"
-        embed.description = f"**{guild.name}** • Real-time metrics • {growth_percentage}% server growth {growth_trend}"
-        
         # Add server thumbnail if available
-        if guild.icon:
-            embed.set_thumbnail(url=guild.icon.url)
-        
-        # Create main dashboard content
-        dashboard_content = self._create_dashboard_layout(member_stats, voice_stats, boost_stats)
+        if icon_url:
+            embed.set_thumbnail(url=icon_url)
         
         # Add the main dashboard as a single field for better layout
         embed.add_field(
             name="",
-            value=dashboard_content,
+            value=state['content'],
             inline=False
         )
         
-        # Enhanced footer with server status
+        # Weekly activity heatmap, once there is any data
+        if state.get('heatmap'):
+            embed.add_field(name="🗓️ Weekly Activity", value=state['heatmap'], inline=False)
+        
+        # Enhanced footer with server status (the minute timestamp is not part of the hash)
         last_update = self.utils.format_timestamp()
-        server_pulse = "🟢 Server Online" if member_stats['online_members'] > 0 else "🔴 Server Quiet"
+        # Refreshes adapt to activity between these bounds
+        refresh_bounds = (f"{self.utils.format_duration(self.config.update_interval_min)}–"
+                          f"{self.utils.format_duration(self.config.update_interval_max)}")
         embed.set_footer(
-            text=f"🕐 {last_update} • {server_pulse} • Auto-updates every 60s",
-            icon_url=guild.icon.url if guild.icon else None
+            text=f"🕐 {last_update} • {state['server_pulse']} • Auto-updates every {refresh_bounds}",
+            icon_url=icon_url
         )
         
         return embed
@@ -84,15 +239,40 @@ class DashboardCreator:
 
 {boost_sparkle} **│** Server Boosts: **{self.utils.format_number(boost_stats['boost_count'])}** (Tier {boost_stats['boost_level']})
 
-🚀 **│** Boosting Heroes: **{self.utils.format_number(boost_stats['boosters_count'])}** legends
+🚀 **│** Boosting Heroes: **{self._format_count(boost_stats['boosters_count'])}** legends
 
 ```diff
 + Status Breakdown
 ```
-🟢 Online: **{status_counts['online']}** • 🟡 Away: **{status_counts['idle']}** • 🔴 Busy: **{status_counts['dnd']}** • ⚫ Offline: **{status_counts['offline']}**"""
+🟢 Online: **{self._format_count(status_counts['online'])}** • 🟡 Away: **{self._format_count(status_counts['idle'])}** • 🔴 Busy: **{self._format_count(status_counts['dnd'])}** • ⚫ Offline: **{self._format_count(status_counts['offline'])}**"""
         
         return content
     
+    def get_live_status(self, guild: discord.Guild) -> Dict[str, Any]:
+        """Current stats from the in-memory counters, for the built-in API"""
+        member_stats = self._get_member_statistics(guild)
+        voice_stats = self._get_voice_statistics(guild)
+        boost_stats = self._get_boost_statistics(guild)
+        
+        return {
+            'status': 'warming_up' if self.is_warming_up(guild) else 'online',
+            'guild_id': guild.id,
+            'guild_name': guild.name,
+            'total_members': member_stats['total_members'],
+            'online_members': member_stats['online_members'],
+            'members_in_voice': voice_stats['members_in_voice'],
+            'boost_count': boost_stats['boost_count'],
+            'status_counts': member_stats['status_counts'],
+            'voice_channels': self.voice.get_index(guild).get_channel_metrics(),
+            'growth_percentage': self.growth_tracker.calculate_growth_percentage(guild.id, member_stats['total_members']),
+            'growth_trend': self.growth_tracker.get_growth_trend(guild.id),
+            'last_update': datetime.now().isoformat()
+        }
+    
+    def _format_count(self, value: Optional[int]) -> str:
+        """Format a count, or a dash when the current data source cannot provide it"""
+        return "—" if value is None else self.utils.format_number(value)
+    
     def _get_boost_level_name(self, level: int) -> str:
         """Get formatted boost level name"""
         level_names = {0: "None", 1: "Level 1", 2: "Level 2", 3: "Level 3"}
@@ -115,36 +295,60 @@ class DashboardCreator:
     
     def _get_member_statistics(self, guild: discord.Guild) -> Dict[str, int]:
         """Get comprehensive member statistics"""
-        total_members = len([m for m in guild.members if not m.bot])
-        total_bots = len([m for m in guild.members if m.bot])
-        status_counts = self.utils.get_member_status_counts(guild)
+        if self.approximate_counts:
+            return self.approximate_counts.get_member_statistics(guild)
+        if self.is_warming_up(guild):
+            return self._get_last_known_statistics(guild)
+        
+        counter = self.presence.get_counter(guild)
+        status_counts = counter.get_status_counts()
         
         return {
-            'total_members': total_members,
-            'total_bots': total_bots,
+            'total_members': counter.total_members,
+            'total_bots': counter.total_bots,
             'total_all': guild.member_count,
             'online_members': status_counts['total_online'],
             'status_counts': status_counts
         }
     
+    def _get_last_known_statistics(self, guild: discord.Guild) -> Dict[str, Optional[int]]:
+        """Member statistics from the last published state while the member cache fills"""
+        last_known = self.state_writer.get(guild.id)
+        total = last_known['total_members'] if last_known else guild.member_count or 0
+        online = last_known['online_members'] if last_known else 0
+        
+        return {
+            'total_members': total,
+            'total_bots': None,
+            'total_all': guild.member_count,
+            'online_members': online,
+            'status_counts': {'online': None, 'idle': None, 'dnd': None, 'offline': None, 'total_online': online}
+        }
+    
     def _get_voice_statistics(self, guild: discord.Guild) -> Dict[str, int]:
         """Get voice channel statistics"""
-        voice_members = self.utils.get_voice_channel_count(guild)
-        voice_channels = len(guild.voice_channels)
-        active_voice_channels = len([vc for vc in guild.voice_channels if len(vc.members) > 0])
+        index = self.voice.get_index(guild)
         
         return {
-            'members_in_voice': voice_members,
-            'total_voice_channels': voice_channels,
-            'active_voice_channels': active_voice_channels
+            'members_in_voice': index.members_in_voice,
+            'total_voice_channels': len(guild.voice_channels),
+            'active_voice_channels': index.active_voice_channels
         }
     
     def _get_boost_statistics(self, guild: discord.Guild) -> Dict[str, Any]:
         """Get server boost statistics"""
-        return self.utils.get_boost_info(guild)
+        boost_info = self.utils.get_boost_info(guild)
+        if self.approximate_counts:
+            boost_info['boosters_count'] = None  # Only boosters in the (voice-only) cache would be counted
+        return boost_info
     
 
     
+    def close(self):
+        """Flush and close persisted state"""
+        self.growth_tracker.close()
+        self.state_writer.close()
+    
     def create_error_embed(self, error_message: str) -> discord.Embed:
         """Create an error embed for when statistics can't be gathered"""
         embed = discord.Embed(
@@ -0,0 +1,50 @@
+"""
+Per-guild dashboard state for the multi-guild bot
+"""
+
+import logging
+from typing import Optional
+import discord
+from update_scheduler import AdaptiveInterval, UpdateScheduler
+from write_queue import WriteQueue
+
+logger = logging.getLogger(__name__)
+
+class DashboardTarget:
+    """One guild's dashboard: where it is posted and how its renders are scheduled"""
+
+    def __init__(self, channel_id: int, guild_id: Optional[int] = None):
+        self.channel_id = channel_id
+        self.guild_id = guild_id  # None until resolved from the channel in single-guild mode
+        self.channel: Optional[discord.TextChannel] = None
+        self.message: Optional[discord.Message] = None
+        self.scheduler: Optional[UpdateScheduler] = None
+        self.refresh: Optional[AdaptiveInterval] = None  # When the next periodic render is due
+        self.writes: Optional[WriteQueue] = None  # Paced sends/edits to the dashboard channel
+        self.disabled_reason: Optional[str] = None
+        self.restored = False  # Whether the persisted/previous message lookup already ran
+        self.permissions_ok = False  # Cached result of the permission check, kept across reconnects
+
+    @property
+    def guild(self) -> Optional[discord.Guild]:
+        """Guild the dashboard channel belongs to"""
+        return self.channel.guild if self.channel else None
+
+    @property
+    def is_active(self) -> bool:
+        """Whether this dashboard should currently be rendered"""
+        return self.channel is not None and self.disabled_reason is None
+
+    def mark_dirty(self, reason: str):
+        """Request a render of this dashboard"""
+        if self.scheduler and self.is_active:
+            self.scheduler.mark_dirty(reason)
+
+    def disable(self, reason: str):
+        """Stop updating this dashboard without affecting the others"""
+        self.disabled_reason = reason
+        if self.scheduler:
+            self.scheduler.stop()
+        if self.writes:
+            self.writes.stop()
+        logger.error(f"❌ Dashboard for channel {self.channel_id} disabled: {reason}")
@@ -0,0 +1,186 @@
+"""
+Lightweight stand-ins for discord.py guild objects
+Used by the benchmark and load-test tools to exercise the dashboard without a gateway connection
+"""
+
+import asyncio
+import random
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+import discord
+
+DEFAULT_STATUS_MIX = {'online': 0.15, 'idle': 0.05, 'dnd': 0.03, 'offline': 0.77}
+
+class FakeMember:
+    """Just the Member attributes the bot reads"""
+
+    __slots__ = ('id', 'guild', 'bot', 'status', 'name')
+
+    def __init__(self, member_id: int, guild: "FakeGuild", status: discord.Status, bot: bool = False):
+        self.id = member_id
+        self.guild = guild
+        self.bot = bot
+        self.status = status
+        self.name = f"member-{member_id}"
+
+    def with_status(self, status: discord.Status) -> "FakeMember":
+        """Copy of this member with another status (the 'after' of a presence update)"""
+        return FakeMember(self.id, self.guild, status, self.bot)
+
+class FakeVoiceState:
+    """VoiceState reduced to the channel"""
+
+    __slots__ = ('channel',)
+
+    def __init__(self, channel: Optional["FakeVoiceChannel"] = None):
+        self.channel = channel
+
+class FakeVoiceChannel(discord.VoiceChannel):
+    """Voice channel with an explicit member list (subclassed so isinstance checks pass)"""
+
+    def __init__(self, channel_id: int, name: str, guild: "FakeGuild"):
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self._fake_members: List[FakeMember] = []
+
+    @property
+    def members(self) -> List[FakeMember]:
+        return self._fake_members
+
+class FakeHTTP:
+    """Records outgoing API calls, with latency and a per-route rate limit like Discord's"""
+
+    def __init__(self, latency: float = 0.05, limit: int = 5, window: float = 5.0,
+                 max_ratelimit_timeout: float = 30.0):
+        self.latency = latency
+        self.limit = limit  # Calls allowed per route and window
+        self.window = window
+        self.max_ratelimit_timeout = max_ratelimit_timeout  # Longer waits raise like discord.py does
+        self.calls: List[Tuple[float, str]] = []
+        self.rate_limit_waits = 0
+        self.rate_limit_raises = 0
+        self._recent: Dict[str, Deque[float]] = {}
+
+    async def request(self, route: str):
+        """Simulate one call: wait out the bucket if needed, then the network latency"""
+        loop = asyncio.get_running_loop()
+        recent = self._recent.setdefault(route, deque())
+        now = loop.time()
+        while recent and recent[0] <= now - self.window:
+            recent.popleft()
+
+        if len(recent) >= self.limit:
+            retry_after = recent[0] + self.window - now
+            if retry_after > self.max_ratelimit_timeout:
+                self.rate_limit_raises += 1
+                raise discord.RateLimited(retry_after)
+            self.rate_limit_waits += 1
+            await asyncio.sleep(retry_after)
+            recent.popleft()
+
+        recent.append(loop.time())
+        await asyncio.sleep(self.latency)
+        self.calls.append((loop.time(), route))
+
+    def calls_by_route(self) -> Dict[str, int]:
+        """Number of recorded calls per route"""
+        counts: Dict[str, int] = {}
+        for _, route in self.calls:
+            counts[route] = counts.get(route, 0) + 1
+        return counts
+
+class FakeMessage:
+    """Sent dashboard message whose edits go through the fake HTTP layer"""
+
+    def __init__(self, message_id: int, channel: "FakeTextChannel", embed: discord.Embed):
+        self.id = message_id
+        self.channel = channel
+        self.embeds = [embed]
+
+    async def edit(self, embed: discord.Embed):
+        await self.channel.http.request(f"PATCH /channels/{self.channel.id}/messages/{{id}}")
+        self.embeds = [embed]
+
+class FakeTextChannel(discord.TextChannel):
+    """Text channel that sends through a FakeHTTP and grants every permission"""
+
+    def __init__(self, channel_id: int, name: str, guild: "FakeGuild", http: FakeHTTP):
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.http = http
+        self.sent: List[FakeMessage] = []
+
+    def permissions_for(self, obj) -> discord.Permissions:
+        return discord.Permissions.all()
+
+    async def send(self, embed: discord.Embed) -> FakeMessage:
+        await self.http.request(f"POST /channels/{self.id}/messages")
+        message = FakeMessage(len(self.sent) + 1, self, embed)
+        self.sent.append(message)
+        return message
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        for message in self.sent:
+            if message.id == message_id:
+                return message
+        raise discord.NotFound(_FakeResponse(404), "Unknown Message")
+
+    async def history(self, limit: int = 100) -> AsyncIterator[FakeMessage]:
+        for message in reversed(self.sent[-limit:]):
+            yield message
+
+class _FakeResponse:
+    """Enough of an aiohttp response to build discord.HTTPException"""
+
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = "Fake"
+
+class FakeGuild:
+    """Guild with a member cache, voice channels and boost info"""
+
+    def __init__(self, guild_id: int, name: str = "Benchmark Guild"):
+        self.id = guild_id
+        self.name = name
+        self.icon = None
+        self.me = None  # The bot's own member; FakeTextChannel ignores it when checking permissions
+        self.chunked = True  # The member cache is complete from the start
+        self.members: List[FakeMember] = []
+        self.voice_channels: List[FakeVoiceChannel] = []
+        self.premium_subscription_count = 0
+        self.premium_tier = 0
+        self.premium_subscribers: List[FakeMember] = []
+
+    @property
+    def member_count(self) -> int:
+        return len(self.members)
+
+def make_guild(member_count: int, guild_id: int = 1, status_mix: Optional[Dict[str, float]] = None,
+               bot_ratio: float = 0.02, voice_channels: int = 10, voice_ratio: float = 0.01,
+               boosters: int = 14, seed: int = 0) -> FakeGuild:
+    """Build a guild with a given size and status distribution, reproducibly from ``seed``"""
+    rng = random.Random(seed)
+    mix = status_mix or DEFAULT_STATUS_MIX
+    statuses = [discord.Status(name) for name in mix]
+    weights = list(mix.values())
+
+    guild = FakeGuild(guild_id)
+    guild.members = [
+        FakeMember(guild_id * 10_000_000 + i, guild, status, rng.random() < bot_ratio)
+        for i, status in enumerate(rng.choices(statuses, weights, k=member_count))
+    ]
+
+    guild.voice_channels = [
+        FakeVoiceChannel(guild_id * 1000 + i, f"voice-{i}", guild) for i in range(voice_channels)
+    ]
+    if guild.voice_channels:
+        online = [m for m in guild.members if m.status is not discord.Status.offline]
+        for member in rng.sample(online, min(len(online), int(member_count * voice_ratio))):
+            rng.choice(guild.voice_channels).members.append(member)
+
+    guild.premium_subscribers = guild.members[:min(boosters, member_count)]
+    guild.premium_subscription_count = len(guild.premium_subscribers) * 2
+    guild.premium_tier = sum(guild.premium_subscription_count >= needed for needed in (2, 7, 14))
+    return guild
@@ -4,30 +4,177 @@ Tracks member changes over time to calculate real growth percentages
 """
 import json
 import os
+from bisect import bisect_left
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+from snapshot_log import JOURNALS, open_journal
+from sqlite_store import SQLiteSnapshotLog
+from rollups import RollupSeries
+from snapshot_columns import SnapshotColumns
+from persistence import LatestOnly, SnapshotWriter
+from heatmap import ActivityHeatmap, HeatmapStore
 
 class GrowthTracker:
     """Tracks server growth over time"""
     
-    def __init__(self, data_file: str = "growth_data.json"):
+    DAILY_RETENTION = JOURNALS['daily']['retention']
+    WEEKLY_RETENTION = JOURNALS['weekly']['retention']
+    TREND_WINDOW = timedelta(hours=1)
+    ACTIVITY_WINDOW = timedelta(hours=1)
+    ACTIVITY_FALLBACK_SNAPSHOTS = 10  # Used when nothing was recorded inside the window
+    METRICS = ("total_members", "online_members")
+    
+    def __init__(self, data_file: str = "growth_data.json", log_dir: str = "growth_log",
+                 storage: str = "jsonl", db_path: str = "growth_data.db", batch_size: int = 1,
+                 writer: Optional[SnapshotWriter] = None, heatmap_file: str = "activity_heatmap.json"):
         self.data_file = data_file
+        self.log_dir = log_dir
+        self.storage = storage
+        self.writer = writer  # Background writer; without one, snapshots are written inline
+        if storage == "sqlite":
+            self.daily_log = SQLiteSnapshotLog(db_path, "daily_snapshots", self.DAILY_RETENTION, batch_size)
+            self.weekly_log = SQLiteSnapshotLog(db_path, "weekly_snapshots", self.WEEKLY_RETENTION, batch_size)
+        else:
+            self.daily_log, self.weekly_log = self._open_journals(log_dir)
+        self.rollups: Dict[int, Dict[str, RollupSeries]] = {}
         self.growth_data = self._load_data()
+        self._build_rollups()
+        self.heatmap_store = HeatmapStore(heatmap_file)
+        self._heatmap_target = LatestOnly(self.heatmap_store.save)  # Queued saves; only a batch's newest is written
+        self.heatmaps: Dict[int, ActivityHeatmap] = self.heatmap_store.load()
+        self._heatmap_hour: Optional[str] = None  # Date and hour the heatmaps were last saved in
+    
+    @staticmethod
+    def _open_journals(log_dir: str):
+        """Open the daily and weekly JSON-lines journals"""
+        return open_journal(log_dir, "daily"), open_journal(log_dir, "weekly")
+    
+    def _load_data(self) -> Dict[int, Dict[str, SnapshotColumns]]:
+        """Load per-guild growth data from the snapshot storage"""
+        if self.daily_log.is_empty() and self.weekly_log.is_empty():
+            if self.storage == "sqlite" and os.path.isdir(self.log_dir):
+                self._import_journal()
+            else:
+                self._import_legacy_file()
+        
+        now = datetime.now()
+        growth_data: Dict[int, Dict[str, SnapshotColumns]] = {}
+        for key, log, retention in (("daily_snapshots", self.daily_log, self.DAILY_RETENTION),
+                                    ("weekly_snapshots", self.weekly_log, self.WEEKLY_RETENTION)):
+            for snapshot in log.replay(now - retention):
+                guild_id = snapshot["guild_id"]
+                guild_data = growth_data.get(guild_id)
+                if guild_data is None:
+                    guild_data = growth_data[guild_id] = self._empty_guild_data(guild_id)
+                guild_data[key].append_snapshot(snapshot)
+        return growth_data
+    
+    def _import_journal(self):
+        """One-time migration from the JSON-lines journal into SQLite"""
+        now = datetime.now()
+        daily_log, weekly_log = self._open_journals(self.log_dir)
+        self.daily_log.import_records(list(daily_log.replay(now - self.DAILY_RETENTION)))
+        self.weekly_log.import_records(list(weekly_log.replay(now - self.WEEKLY_RETENTION)))
+        daily_log.close()
+        weekly_log.close()
+    
+    def close(self):
+        """Drain pending writes, then flush and close the snapshot storage"""
+        if self.writer:
+            self.writer.close()
+        if self.heatmaps:
+            self.heatmap_store.save(self._heatmap_state())
+        self.daily_log.close()
+        self.weekly_log.close()
+    
+    @staticmethod
+    def _empty_guild_data(guild_id: int) -> Dict[str, SnapshotColumns]:
+        """Fresh history for a guild that has no snapshots yet"""
+        return {"daily_snapshots": SnapshotColumns(guild_id), "weekly_snapshots": SnapshotColumns(guild_id)}
+    
+    def get_guild_data(self, guild_id: int) -> Dict[str, SnapshotColumns]:
+        """Get (or create) the snapshot history of one guild"""
+        guild_data = self.growth_data.get(guild_id)
+        if guild_data is None:
+            guild_data = self._empty_guild_data(guild_id)
+            self.growth_data[guild_id] = guild_data
+        return guild_data
+    
+    def get_rollups(self, guild_id: int) -> Dict[str, RollupSeries]:
+        """Get (or create) the minute/hour/day rollups of one guild"""
+        rollups = self.rollups.get(guild_id)
+        if rollups is None:
+            rollups = {metric: RollupSeries() for metric in self.METRICS}
+            self.rollups[guild_id] = rollups
+        return rollups
+    
+    def _add_to_rollups(self, guild_id: int, ts: float, total_members: int, online_members: int,
+                        tiers: Optional[List[str]] = None):
+        """Fold one snapshot into its guild's rollups (O(1) per tier)"""
+        rollups = self.get_rollups(guild_id)
+        rollups["total_members"].add(ts, total_members, tiers)
+        rollups["online_members"].add(ts, online_members, tiers)
+    
+    def _build_rollups(self):
+        """Rebuild the rollups from the journal once at startup"""
+        for guild_id, guild_data in self.growth_data.items():
+            daily = guild_data["daily_snapshots"]
+            weekly = guild_data["weekly_snapshots"]
+            first_daily = daily.timestamps[0] if len(daily) else float('inf')
+            
+            # Older days are only known from the once-per-day weekly snapshots
+            for i in range(bisect_left(weekly.timestamps, first_daily)):
+                self._add_to_rollups(guild_id, weekly.timestamps[i], weekly.total_members[i],
+                                     weekly.online_members[i], tiers=["hour", "day"])
+            
+            for ts, total, online in zip(daily.timestamps, daily.total_members, daily.online_members):
+                self._add_to_rollups(guild_id, ts, total, online)
     
-    def _load_data(self) -> Dict:
-        """Load growth data from file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass
-        return {"daily_snapshots": [], "weekly_snapshots": []}
-    
-    def _save_data(self):
-        """Save growth data to file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.growth_data, f, indent=2)
+    def get_heatmap(self, guild_id: int) -> ActivityHeatmap:
+        """Get (or create) the hour-of-week activity heatmap of one guild"""
+        heatmap = self.heatmaps.get(guild_id)
+        if heatmap is None:
+            heatmap = self.heatmaps[guild_id] = ActivityHeatmap()
+        return heatmap
+    
+    def _heatmap_state(self) -> Dict:
+        """Copy of every heatmap's running sums and counts"""
+        return {"guilds": {str(guild_id): heatmap.to_state() for guild_id, heatmap in self.heatmaps.items()}}
+    
+    def get_history(self, guild_id: int, resolution: str, start: datetime, end: datetime) -> List[Dict]:
+        """Rollup buckets of both metrics, in the same shape as the web dashboard's history points"""
+        rollups = self.get_rollups(guild_id)
+        online_buckets = {
+            bucket.start: bucket
+            for bucket in rollups["online_members"].buckets(resolution, start.timestamp(), end.timestamp())
+        }
+        points = []
+        for total in rollups["total_members"].buckets(resolution, start.timestamp(), end.timestamp()):
+            online = online_buckets.get(total.start)
+            points.append({
+                'start': datetime.fromtimestamp(total.start).isoformat(),
+                'count': total.count,
+                'total_members': {'min': total.min, 'max': total.max, 'mean': round(total.mean, 2)},
+                'online_members': {'min': online.min, 'max': online.max, 'mean': round(online.mean, 2)} if online else None
+            })
+        return points
+    
+    def _import_legacy_file(self):
+        """One-time import of the old single-file growth_data.json"""
+        if not os.path.exists(self.data_file):
+            return
+        try:
+            with open(self.data_file, 'r') as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return
+        
+        self.daily_log.import_records(legacy.get("daily_snapshots", []))
+        self.weekly_log.import_records(legacy.get("weekly_snapshots", []))
+        self.daily_log.run_maintenance(datetime.now(), background=False)
+        
+        # Keep the original around, but never import it twice
+        os.replace(self.data_file, self.data_file + ".imported")
     
     def record_snapshot(self, guild_id: int, total_members: int, online_members: int):
         """Record a snapshot of current server state"""
@@ -41,45 +188,60 @@ class GrowthTracker:
             "hour": now.hour
         }
         
+        guild_data = self.get_guild_data(guild_id)
+        ts = now.timestamp()
+        
         # Add to daily snapshots
-        self.growth_data["daily_snapshots"].append(snapshot)
+        guild_data["daily_snapshots"].append(ts, total_members, online_members)
+        self._persist(self.daily_log, snapshot, now)
+        self._add_to_rollups(guild_id, ts, total_members, online_members)
+        self.get_heatmap(guild_id).add(now.weekday(), now.hour, online_members)
+        
+        # Save the heatmaps once per hour; close() saves the rest
+        hour_key = f"{snapshot['date']} {now.hour}"
+        if hour_key != self._heatmap_hour:
+            self._heatmap_hour = hour_key
+            if self.writer:
+                self.writer.submit(self._heatmap_target, self._heatmap_state(), now)
+            else:
+                self.heatmap_store.save(self._heatmap_state())
         
-        # Keep only last 7 days of hourly data
-        cutoff_date = now - timedelta(days=7)
-        self.growth_data["daily_snapshots"] = [
-            s for s in self.growth_data["daily_snapshots"]
-            if datetime.fromisoformat(s["timestamp"]) > cutoff_date
-        ]
+        # Keep only last 7 days of hourly data (binary search on the timestamp column)
+        guild_data["daily_snapshots"].drop_before((now - self.DAILY_RETENTION).timestamp())
         
         # Add weekly snapshot (once per day)
-        if not self._has_daily_snapshot(now.strftime("%Y-%m-%d")):
-            self.growth_data["weekly_snapshots"].append(snapshot)
+        if not self._has_daily_snapshot(guild_id, snapshot["date"]):
+            guild_data["weekly_snapshots"].append(ts, total_members, online_members)
+            self._persist(self.weekly_log, snapshot, now)
             
             # Keep only last 30 days of daily data
-            self.growth_data["weekly_snapshots"] = [
-                s for s in self.growth_data["weekly_snapshots"]
-                if datetime.fromisoformat(s["timestamp"]) > (now - timedelta(days=30))
-            ]
-        
-        self._save_data()
+            guild_data["weekly_snapshots"].drop_before((now - self.WEEKLY_RETENTION).timestamp())
+    
+    def _persist(self, log, snapshot: Dict, now: datetime):
+        """Hand a snapshot to the background writer, or write it inline without one"""
+        if self.writer:
+            self.writer.submit(log, snapshot, now)
+        else:
+            log.append(snapshot, now)
     
-    def _has_daily_snapshot(self, date_str: str) -> bool:
+    def _has_daily_snapshot(self, guild_id: int, date_str: str) -> bool:
         """Check if we already have a snapshot for this date"""
-        return any(s["date"] == date_str for s in self.growth_data["weekly_snapshots"])
+        # Weekly snapshots are appended in time order, so only the newest can match
+        weekly_snapshots = self.get_guild_data(guild_id)["weekly_snapshots"]
+        return bool(weekly_snapshots) and weekly_snapshots[-1]["date"] == date_str
     
-    def calculate_growth_percentage(self, current_members: int) -> int:
+    def calculate_growth_percentage(self, guild_id: int, current_members: int) -> int:
         """Calculate growth percentage based on historical data"""
-        if not self.growth_data["weekly_snapshots"]:
+        daily_series = self.get_rollups(guild_id)["total_members"].tiers["day"]
+        if not len(daily_series):
             # No historical data, calculate based on activity
-            return self._calculate_activity_based_growth(current_members)
+            return self._calculate_activity_based_growth(guild_id, current_members)
         
-        # Get the oldest available snapshot
-        oldest_snapshot = min(
-            self.growth_data["weekly_snapshots"],
-            key=lambda x: datetime.fromisoformat(x["timestamp"])
-        )
+        # First sample of the oldest day inside the growth window (O(log n) lookup)
+        window_start = (datetime.now() - self.WEEKLY_RETENTION).timestamp()
+        baseline = daily_series.find(window_start) or daily_series.oldest()
         
-        past_members = oldest_snapshot["total_members"]
+        past_members = baseline.first
         
         if past_members == 0:
             return 100
@@ -90,33 +252,40 @@ class GrowthTracker:
         # Ensure it's between 0 and 100
         return max(0, min(int(growth + 50), 100))  # Add base 50% for visual appeal
     
-    def _calculate_activity_based_growth(self, total_members: int) -> int:
+    def _calculate_activity_based_growth(self, guild_id: int, total_members: int) -> int:
         """Calculate growth based on recent activity when no historical data exists"""
-        if not self.growth_data["daily_snapshots"]:
+        daily_snapshots = self.get_guild_data(guild_id)["daily_snapshots"]
+        if not daily_snapshots:
             return 75  # Default value
         
-        # Calculate average online percentage from recent snapshots
-        recent_snapshots = self.growth_data["daily_snapshots"][-10:]  # Last 10 snapshots
-        if not recent_snapshots:
-            return 75
-        
-        avg_online_percentage = sum(
-            (s["online_members"] / max(s["total_members"], 1)) * 100
-            for s in recent_snapshots
-        ) / len(recent_snapshots)
+        # Average online percentage over the recent window, located by bisecting the timestamps
+        now = datetime.now()
+        lo, hi = daily_snapshots.window((now - self.ACTIVITY_WINDOW).timestamp(), now.timestamp())
+        if lo == hi:
+            # Nothing recent (e.g. right after downtime): use the newest snapshots instead
+            hi = len(daily_snapshots)
+            lo = max(hi - self.ACTIVITY_FALLBACK_SNAPSHOTS, 0)
+        avg_online_percentage = daily_snapshots.mean_online_ratio(lo, hi) * 100
         
         # Convert activity to growth percentage
         return max(25, min(int(avg_online_percentage + 40), 100))
     
-    def get_growth_trend(self) -> str:
-        """Get growth trend indicator"""
-        if len(self.growth_data["daily_snapshots"]) < 2:
+    def get_growth_trend(self, guild_id: int, window: Optional[timedelta] = None) -> str:
+        """Get growth trend indicator over a time window (default: the last hour)"""
+        series = self.get_rollups(guild_id)["total_members"]
+        latest = series.latest()
+        if latest is None:
             return "📊"
         
-        recent = self.growth_data["daily_snapshots"][-2:]
-        if recent[1]["total_members"] > recent[0]["total_members"]:
+        window_start = (datetime.now() - (window or self.TREND_WINDOW)).timestamp()
+        past = series.value_at(window_start)
+        if past is None:
+            # History is shorter than the window, compare with the oldest sample
+            past = series.oldest("minute").first
+        
+        if latest > past:
             return "📈"
-        elif recent[1]["total_members"] < recent[0]["total_members"]:
+        elif latest < past:
             return "📉"
         else:
-            return "📊"
\ No newline at end of file
+            return "📊"
@@ -0,0 +1,104 @@
+"""
+Hour-of-week activity heatmap
+Running online-member sums and counts per weekday and hour, updated in O(1) per snapshot
+"""
+
+import json
+import os
+from array import array
+from typing import Dict, List, Optional, Tuple
+from persistence import atomic_write_json
+
+DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+HOURS = 24
+SLOTS = len(DAYS) * HOURS
+SPARK = "▁▂▃▄▅▆▇█"
+
+class ActivityHeatmap:
+    """7×24 grid of mean online members for one guild"""
+
+    def __init__(self, sums: Optional[List[float]] = None, counts: Optional[List[int]] = None):
+        self.sums = array('d', sums or [0.0] * SLOTS)
+        self.counts = array('q', counts or [0] * SLOTS)
+
+    def add(self, weekday: int, hour: int, online_members: int):
+        """Fold one snapshot into its hour-of-week cell"""
+        slot = weekday * HOURS + hour
+        self.sums[slot] += online_members
+        self.counts[slot] += 1
+
+    def mean(self, weekday: int, hour: int) -> Optional[float]:
+        """Mean online members in one cell, None without samples"""
+        slot = weekday * HOURS + hour
+        return self.sums[slot] / self.counts[slot] if self.counts[slot] else None
+
+    def is_empty(self) -> bool:
+        """Check whether any snapshot was recorded yet"""
+        return not any(self.counts)
+
+    def grid(self) -> List[List[Optional[float]]]:
+        """Means as rows of weekdays with one column per hour"""
+        return [[self.mean(day, hour) for hour in range(HOURS)] for day in range(len(DAYS))]
+
+    def peak_hours(self, count: int = 3) -> List[Tuple[int, int, float]]:
+        """Busiest (weekday, hour, mean) cells"""
+        cells = [
+            (day, hour, self.sums[day * HOURS + hour] / self.counts[day * HOURS + hour])
+            for day in range(len(DAYS)) for hour in range(HOURS) if self.counts[day * HOURS + hour]
+        ]
+        return sorted(cells, key=lambda cell: cell[2], reverse=True)[:count]
+
+    def render_block(self) -> str:
+        """One sparkline per weekday in a code block, scaled to the busiest cell"""
+        if self.is_empty():
+            return ""
+        grid = self.grid()
+        top = max(mean for row in grid for mean in row if mean is not None) or 1
+        lines = [f"     {'0':<6}{'6':<6}{'12':<6}{'18':<6}"]
+        for day, row in zip(DAYS, grid):
+            cells = "".join(" " if mean is None else SPARK[min(len(SPARK) - 1, int(mean / top * len(SPARK)))] for mean in row)
+            lines.append(f"{day}  {cells}")
+        peaks = ", ".join(f"{DAYS[day]} {hour:02d}:00" for day, hour, _ in self.peak_hours())
+        return "```\n" + "\n".join(lines) + "\n```\n" + f"Peak hours: **{peaks}**"
+
+    def as_dict(self) -> Dict:
+        """Serializable view for the web API"""
+        return {
+            'days': list(DAYS),
+            'mean_online': [[None if mean is None else round(mean, 2) for mean in row] for row in self.grid()],
+            'samples': [list(self.counts[day * HOURS:(day + 1) * HOURS]) for day in range(len(DAYS))],
+            'peaks': [{'day': DAYS[day], 'hour': hour, 'mean_online': round(mean, 2)}
+                      for day, hour, mean in self.peak_hours()]
+        }
+
+    def to_state(self) -> Dict[str, List]:
+        """Running sums and counts for the heatmap file"""
+        return {'sums': list(self.sums), 'counts': list(self.counts)}
+
+class HeatmapStore:
+    """Small JSON file holding every guild's heatmap state"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Dict[int, ActivityHeatmap]:
+        """Read the saved heatmaps; the grid is never rebuilt from snapshot history"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            return {
+                int(guild_id): ActivityHeatmap(state['sums'], state['counts'])
+                for guild_id, state in data.get('guilds', {}).items()
+                if len(state['sums']) == SLOTS and len(state['counts']) == SLOTS
+            }
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError):
+            return {}
+
+    def save(self, state: Dict):
+        """Atomically replace the file with the given state"""
+        atomic_write_json(self.path, state, indent=None)
+
+    def close(self):
+        """Nothing is kept open"""
@@ -0,0 +1,132 @@
+"""
+Downsampled snapshot history queries
+Streams per-bucket aggregates from the bot's snapshot storage without loading whole ranges into memory
+"""
+
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+from rollups import Bucket
+from snapshot_log import JOURNALS, open_journal
+
+RESOLUTIONS = {'minute': 60, 'hour': 3600, 'day': 86400}
+DAILY_RETENTION = JOURNALS['daily']['retention']
+MAX_AUTO_POINTS = 500
+
+def parse_time(value: Optional[str], default: datetime) -> datetime:
+    """Parse an ISO datetime or epoch seconds query parameter as naive local time
+
+    Raises ValueError for anything else, including epoch values out of range.
+    """
+    if value is None:
+        return default
+    try:
+        return datetime.fromtimestamp(float(value))
+    except (OverflowError, OSError) as e:
+        raise ValueError(f"timestamp out of range: {value}") from e
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        # Snapshots are stored in naive local time, so offsets are converted rather than compared
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def pick_resolution(start: datetime, end: datetime) -> str:
+    """Finest resolution that keeps a range under MAX_AUTO_POINTS buckets"""
+    span = (end - start).total_seconds()
+    for name, width in RESOLUTIONS.items():
+        if span / width <= MAX_AUTO_POINTS:
+            return name
+    return 'day'
+
+def _bucket_start(ts: float, width: int) -> float:
+    """Bucket boundary for a timestamp; day buckets follow local midnight"""
+    offset = time.localtime().tm_gmtoff if width >= 86400 else 0
+    return ts - (ts + offset) % width
+
+def _bucket_dict(start: float, total: Bucket, online: Bucket) -> Dict:
+    """Serializable view of one history point"""
+    return {
+        'start': datetime.fromtimestamp(start).isoformat(),
+        'count': total.count,
+        'total_members': {'min': total.min, 'max': total.max, 'mean': round(total.mean, 2)},
+        'online_members': {'min': online.min, 'max': online.max, 'mean': round(online.mean, 2)}
+    }
+
+def _downsample(rows: Iterator[tuple], width: int) -> Iterator[Dict]:
+    """Fold time-ordered (ts, total, online) rows into buckets, holding only the open bucket"""
+    current_start: Optional[float] = None
+    total = online = None
+    for ts, total_members, online_members in rows:
+        start = _bucket_start(ts, width)
+        if start != current_start:
+            if current_start is not None:
+                yield _bucket_dict(current_start, total, online)
+            current_start = start
+            total, online = Bucket(start, total_members), Bucket(start, online_members)
+        else:
+            total.add(total_members)
+            online.add(online_members)
+    if current_start is not None:
+        yield _bucket_dict(current_start, total, online)
+
+def _split_range(start: datetime, end: datetime):
+    """Split a range into the part only covered by weekly snapshots and the daily part"""
+    daily_start = datetime.now() - DAILY_RETENTION
+    weekly_range = (start, min(end, daily_start)) if start < daily_start else None
+    daily_range = (max(start, daily_start), end) if end > daily_start else None
+    return weekly_range, daily_range
+
+def iter_journal_history(log_dir: str, guild_id: int, start: datetime, end: datetime,
+                         resolution: str) -> Iterator[Dict]:
+    """Downsampled history read segment by segment from the JSON-lines journal"""
+    weekly_range, daily_range = _split_range(start, end)
+
+    def rows(name: str, range_start: datetime, range_end: datetime):
+        log = open_journal(log_dir, name)
+        end_iso = range_end.isoformat()
+        for record in log.replay(range_start):
+            if record["timestamp"] > end_iso:
+                break
+            if record["guild_id"] == guild_id:
+                ts = datetime.fromisoformat(record["timestamp"]).timestamp()
+                yield ts, record["total_members"], record["online_members"]
+
+    width = RESOLUTIONS[resolution]
+    if weekly_range and os.path.isdir(os.path.join(log_dir, "weekly")):
+        yield from _downsample(rows("weekly", *weekly_range), width)
+    if daily_range and os.path.isdir(os.path.join(log_dir, "daily")):
+        yield from _downsample(rows("daily", *daily_range), width)
+
+def iter_sqlite_history(db_path: str, guild_id: int, start: datetime, end: datetime,
+                        resolution: str) -> Iterator[Dict]:
+    """Downsampled history aggregated by SQLite with GROUP BY over the (guild_id, ts) index"""
+    width = RESOLUTIONS[resolution]
+    offset = time.localtime().tm_gmtoff if width >= 86400 else 0
+    weekly_range, daily_range = _split_range(start, end)
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for table, table_range in (("weekly_snapshots", weekly_range), ("daily_snapshots", daily_range)):
+            if table_range is None:
+                continue
+            cursor = conn.execute(
+                f"SELECT CAST((ts + ?) / ? AS INTEGER) AS bucket, COUNT(*), "
+                "MIN(total_members), MAX(total_members), AVG(total_members), "
+                "MIN(online_members), MAX(online_members), AVG(online_members) "
+                f"FROM {table} WHERE guild_id = ? AND ts >= ? AND ts <= ? "
+                "GROUP BY bucket ORDER BY bucket",
+                (offset, width, guild_id, table_range[0].timestamp(), table_range[1].timestamp())
+            )
+            for bucket, count, t_min, t_max, t_mean, o_min, o_max, o_mean in cursor:
+                yield {
+                    'start': datetime.fromtimestamp(bucket * width - offset).isoformat(),
+                    'count': count,
+                    'total_members': {'min': t_min, 'max': t_max, 'mean': round(t_mean, 2)},
+                    'online_members': {'min': o_min, 'max': o_max, 'mean': round(o_mean, 2)}
+                }
+    finally:
+        conn.close()
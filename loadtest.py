@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Offline gateway replay and load test
+Drives ParanoiaBot's event handlers from generated or recorded event streams against fake guilds,
+captures its API calls in a fake HTTP layer and reports event-loop lag, renders and call rates
+
+    python loadtest.py --scenario raid --events 10000 --rate 500
+    python loadtest.py --scenario voice --events 2000 --rate 50 --record voice.jsonl
+    python loadtest.py --replay voice.jsonl --speed 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional
+import discord
+from config import Config
+from fakes import FakeHTTP, FakeMember, FakeTextChannel, FakeVoiceState, make_guild
+
+CHANNEL_ID = 900_000_000
+GUILD_ID = 1
+LAG_INTERVAL = 0.05  # seconds between event-loop lag probes
+
+SCENARIOS = ('raid', 'exodus', 'presence', 'voice', 'mixed')
+
+def generate_events(scenario: str, count: int, rate: float, member_ids: List[int],
+                    channel_ids: List[int], seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Synthetic event stream; ``at`` is seconds since the start"""
+    rng = random.Random(seed)
+    next_id = max(member_ids, default=0) + 1
+    in_voice: Dict[int, int] = {}
+    statuses = ('online', 'idle', 'dnd', 'offline')
+    kinds = {'raid': ['member_join'], 'exodus': ['member_remove'], 'presence': ['presence_update'],
+             'voice': ['voice'], 'mixed': ['member_join', 'presence_update', 'presence_update', 'voice']}[scenario]
+    remaining = list(member_ids)
+
+    for i in range(count):
+        at = round(i / rate, 6)
+        kind = rng.choice(kinds)
+        if kind == 'member_join':
+            yield {'at': at, 'event': 'member_join', 'member': next_id, 'status': rng.choice(statuses)}
+            next_id += 1
+        elif kind == 'member_remove' and remaining:
+            member_id = remaining.pop(rng.randrange(len(remaining)))
+            in_voice.pop(member_id, None)
+            yield {'at': at, 'event': 'member_remove', 'member': member_id}
+        elif kind == 'presence_update' and remaining:
+            yield {'at': at, 'event': 'presence_update', 'member': rng.choice(remaining), 'status': rng.choice(statuses)}
+        elif kind == 'voice' and remaining and channel_ids:
+            # Leave about as often as join so occupancy stays bounded
+            if in_voice and (rng.random() < 0.5 or len(in_voice) >= len(remaining)):
+                member_id = rng.choice(list(in_voice))
+                del in_voice[member_id]
+                yield {'at': at, 'event': 'voice_leave', 'member': member_id}
+            else:
+                member_id = rng.choice(remaining)
+                if member_id in in_voice:
+                    continue
+                in_voice[member_id] = rng.choice(channel_ids)
+                yield {'at': at, 'event': 'voice_join', 'member': member_id, 'channel': in_voice[member_id]}
+
+def load_events(path: str) -> Iterator[Dict[str, Any]]:
+    """Read a recorded stream (one JSON event per line)"""
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+class GatewayReplayer:
+    """Applies events to the fake guild cache and dispatches them the way the gateway would"""
+
+    def __init__(self, bot, guild):
+        self.bot = bot
+        self.guild = guild
+        self.members: Dict[int, FakeMember] = {member.id: member for member in guild.members}
+        self.positions: Dict[int, int] = {member.id: i for i, member in enumerate(guild.members)}
+        self.channels = {channel.id: channel for channel in guild.voice_channels}
+        self.voice: Dict[int, Any] = {}
+        self.dispatched = 0
+        self.ignored = 0
+
+    def apply(self, event: Dict[str, Any]):
+        """Update cached state, then dispatch the matching bot event"""
+        kind = event['event']
+        member = self.members.get(event.get('member'))
+
+        if kind == 'member_join' and member is None:
+            member = FakeMember(event['member'], self.guild, discord.Status(event.get('status', 'online')),
+                                event.get('bot', False))
+            self.members[member.id] = member
+            self.positions[member.id] = len(self.guild.members)
+            self.guild.members.append(member)
+            self._dispatch('member_join', member)
+        elif kind == 'member_remove' and member is not None:
+            self._leave_voice(member)
+            self._remove(member)
+            self._dispatch('member_remove', member)
+        elif kind in ('presence_update', 'member_update') and member is not None:
+            before = member.with_status(member.status)
+            member.status = discord.Status(event['status'])
+            self._dispatch(kind, before, member)
+        elif kind == 'voice_join' and member is not None and event.get('channel') in self.channels:
+            before = FakeVoiceState(self.voice.get(member.id))
+            if before.channel:
+                before.channel.members.remove(member)
+            channel = self.channels[event['channel']]
+            channel.members.append(member)
+            self.voice[member.id] = channel
+            self._dispatch('voice_state_update', member, before, FakeVoiceState(channel))
+        elif kind == 'voice_leave' and member is not None and member.id in self.voice:
+            before = FakeVoiceState(self.voice[member.id])
+            self._leave_voice(member)
+            self._dispatch('voice_state_update', member, before, FakeVoiceState())
+        else:
+            self.ignored += 1
+
+    def _dispatch(self, event: str, *args):
+        self.bot.dispatch(event, *args)
+        self.dispatched += 1
+
+    def _leave_voice(self, member: FakeMember):
+        channel = self.voice.pop(member.id, None)
+        if channel:
+            channel.members.remove(member)
+
+    def _remove(self, member: FakeMember):
+        """O(1) removal from the member list by swapping in the last member"""
+        index = self.positions.pop(member.id)
+        last = self.guild.members.pop()
+        if last is not member:
+            self.guild.members[index] = last
+            self.positions[last.id] = index
+        del self.members[member.id]
+
+class LagMonitor:
+    """Measures how late the event loop wakes up a periodic sleeper"""
+
+    def __init__(self, interval: float = LAG_INTERVAL):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run(), name="loadtest-lag-monitor")
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+    def summary(self) -> Dict[str, float]:
+        """Lag percentiles in milliseconds"""
+        samples = sorted(self.samples) or [0.0]
+        return {
+            'mean_ms': round(statistics.fmean(samples) * 1000, 2),
+            'p50_ms': round(samples[len(samples) // 2] * 1000, 2),
+            'p99_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2),
+            'max_ms': round(samples[-1] * 1000, 2)
+        }
+
+async def run(args, events: List[Dict[str, Any]], guild) -> Dict[str, Any]:
+    """Start a bot against the fake guild, replay the stream and collect the report"""
+    from bot import ParanoiaBot
+    logging.getLogger().setLevel(args.log_level)  # bot.py configures INFO, which logs (sampled) joins
+
+    config = Config("loadtest", channel_id=CHANNEL_ID)
+    config.api_port = 0
+    config.dashboard_min_interval = args.min_interval
+    config.dashboard_debounce = args.debounce
+    config.dashboard_max_staleness = args.max_staleness
+
+    http = FakeHTTP(latency=args.latency, limit=args.route_limit, window=args.route_window,
+                    max_ratelimit_timeout=config.max_ratelimit_timeout)
+    channel = FakeTextChannel(CHANNEL_ID, "dashboard", guild, http)
+
+    bot = ParanoiaBot(config)
+    await bot._async_setup_hook()
+    bot.get_channel = lambda channel_id: channel if channel_id == CHANNEL_ID else None
+    target = bot.targets[CHANNEL_ID]
+    bot._setup_target(target)
+    await bot._chunk_guilds()  # The fake guild is complete, this only switches it to live counts
+    bot.is_ready = True
+    replayer = GatewayReplayer(bot, guild)
+
+    loop = asyncio.get_running_loop()
+    monitor = LagMonitor()
+    monitor.start()
+    target.mark_dirty("startup")  # First render, like the first dashboard_update_task tick
+
+    started = loop.time()
+    cpu_started = time.process_time()
+    try:
+        for event in events:
+            delay = started + event['at'] / args.speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            replayer.apply(event)
+            if replayer.dispatched % 100 == 0:
+                await asyncio.sleep(0)  # Let handler tasks run even when the stream is behind
+        stream_seconds = loop.time() - started
+
+        # Let the scheduler flush whatever the burst left pending
+        await asyncio.sleep(args.drain)
+        duration = loop.time() - started
+    finally:
+        monitor.stop()
+        await bot.close()
+
+    scheduler = target.scheduler.get_stats()
+    writes = target.writes.get_stats()
+    counter = bot.dashboard.presence.counters.get(guild.id)
+    expected_members = sum(not member.bot for member in guild.members)
+    calls = len(http.calls)
+
+    return {
+        'scenario': args.replay or args.scenario,
+        'events': len(events),
+        'dispatched': replayer.dispatched,
+        'ignored': replayer.ignored,
+        'members_start': args.members,
+        'members_end': len(guild.members),
+        'stream_seconds': round(stream_seconds, 2),
+        'duration_seconds': round(duration, 2),
+        'cpu_seconds': round(time.process_time() - cpu_started, 2),
+        'loop_lag': monitor.summary(),
+        'scheduler': scheduler,
+        'renders_per_event': round(scheduler['renders'] / max(1, replayer.dispatched), 5),
+        'write_queue': writes,
+        'api_calls': calls,
+        'api_calls_by_route': http.calls_by_route(),
+        'api_calls_per_minute': round(calls / (duration / 60), 2) if duration else 0.0,
+        'rate_limit_waits': http.rate_limit_waits,
+        'rate_limit_raises': http.rate_limit_raises,
+        'counts_consistent': counter is not None and counter.total_members == expected_members
+    }
+
+def parse_args(argv: Optional[List[str]] = None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Replay gateway events against the bot offline")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--scenario', choices=SCENARIOS, default='raid')
+    source.add_argument('--replay', help="recorded JSON-lines event stream")
+    parser.add_argument('--events', type=int, default=10_000, help="generated events")
+    parser.add_argument('--rate', type=float, default=500, help="generated events per second")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument('--record', help="save the generated stream as JSON lines")
+    parser.add_argument('--members', type=int, default=5_000, help="members in the guild before the stream")
+    parser.add_argument('--voice-channels', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.05, help="fake API latency in seconds")
+    parser.add_argument('--route-limit', type=int, default=5, help="calls per route and window before 429")
+    parser.add_argument('--route-window', type=float, default=5.0)
+    parser.add_argument('--min-interval', type=float, default=Config("").dashboard_min_interval)
+    parser.add_argument('--debounce', type=float, default=Config("").dashboard_debounce)
+    parser.add_argument('--max-staleness', type=float, default=Config("").dashboard_max_staleness)
+    parser.add_argument('--drain', type=float, default=15.0, help="seconds to keep running after the stream")
+    parser.add_argument('--log-level', default='WARNING', help="bot log level during the run")
+    parser.add_argument('--output', help="write the report as JSON")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Build the guild and stream, run the bot, print the report"""
+    args = parse_args(argv)
+    guild = make_guild(args.members, guild_id=GUILD_ID, voice_channels=args.voice_channels,
+                       voice_ratio=0, seed=args.seed)
+
+    if args.replay:
+        events = list(load_events(args.replay))
+    else:
+        events = list(generate_events(args.scenario, args.events, args.rate,
+                                      [member.id for member in guild.members],
+                                      [channel.id for channel in guild.voice_channels], args.seed))
+        if args.record:
+            with open(args.record, 'w') as f:
+                f.writelines(json.dumps(event) + "\n" for event in events)
+            print(f"💾 Recorded {len(events):,} events to {args.record}")
+
+    output = os.path.abspath(args.output) if args.output else None
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="paranoia-loadtest-") as workdir:
+        os.chdir(workdir)
+        try:
+            report = asyncio.run(run(args, events, guild))
+        finally:
+            os.chdir(cwd)
+
+    print(json.dumps(report, indent=2))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if report['counts_consistent'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
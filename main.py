@@ -4,14 +4,21 @@ Discord Bot Entry Point
 Starts the Paranoia Community Statistics Bot
 """
 
-import asyncio
 import os
 import sys
-from bot import ParanoiaBot
 from config import Config
 
+def run_web():
+    """Standalone Flask dashboard that reads the files a separately running bot writes"""
+    from web_dashboard import app
+    app.run(host='0.0.0.0', port=int(os.getenv("WEB_PORT", "5000")), debug=False)
+
 def main():
-    """Main entry point for the Discord bot"""
+    """Main entry point: the bot with its built-in API, or `main.py web` for the standalone dashboard"""
+    if sys.argv[1:2] == ["web"]:
+        run_web()
+        return
+    
     try:
         # Get Discord bot token from environment variables
         bot_token = os.getenv("DISCORD_BOT_TOKEN")
@@ -20,37 +27,59 @@ def main():
             print("Please set your Discord bot token in the environment variables.")
             sys.exit(1)
         
+        # Optional multi-guild mapping: "guild_id:channel_id,guild_id:channel_id"
+        dashboard_channels = {}
+        dashboards_env = os.getenv("DISCORD_DASHBOARDS")
+        if dashboards_env:
+            try:
+                dashboard_channels = Config.parse_dashboard_channels(dashboards_env)
+            except ValueError:
+                print("❌ Error: DISCORD_DASHBOARDS must look like 'guild_id:channel_id,guild_id:channel_id'!")
+                print(f"Current value: '{dashboards_env}'")
+                sys.exit(1)
+        
         # Get channel ID from environment variables
         channel_id = os.getenv("DISCORD_CHANNEL_ID")
-        if not channel_id:
+        if not channel_id and not dashboard_channels:
             print("❌ Error: DISCORD_CHANNEL_ID environment variable not set!")
-            print("Please set the target channel ID in the environment variables.")
+            print("Please set the target channel ID (or DISCORD_DASHBOARDS) in the environment variables.")
             sys.exit(1)
         
-        # Clean up the channel ID (remove quotes, whitespace, etc.)
-        channel_id = channel_id.strip().strip('"').strip("'")
-        
-        try:
-            channel_id = int(channel_id)
-        except ValueError:
-            print(f"❌ Error: DISCORD_CHANNEL_ID must be a valid integer!")
-            print(f"Current value: '{os.getenv('DISCORD_CHANNEL_ID')}'")
-            print("Please ensure the channel ID contains only numbers (no quotes or spaces)")
-            sys.exit(1)
+        if channel_id:
+            # Clean up the channel ID (remove quotes, whitespace, etc.)
+            channel_id = channel_id.strip().strip('"').strip("'")
+            
+            try:
+                channel_id = int(channel_id)
+            except ValueError:
+                print(f"❌ Error: DISCORD_CHANNEL_ID must be a valid integer!")
+                print(f"Current value: '{os.getenv('DISCORD_CHANNEL_ID')}'")
+                print("Please ensure the channel ID contains only numbers (no quotes or spaces)")
+                sys.exit(1)
+        else:
+            channel_id = None
         
         # Initialize configuration
-        config = Config(bot_token, channel_id)
+        config = Config(bot_token, channel_id, dashboard_channels)
+        
+        # Deferred so the web role never loads discord.py
+        from bot import ParanoiaBot
         
         # Create and run bot
         bot = ParanoiaBot(config)
         
         print("🚀 Starting Paranoia Community Statistics Bot...")
-        print(f"📋 Target Channel ID: {channel_id}")
-        print("⏱️  Update Interval: 1 minute")
+        if channel_id:
+            print(f"📋 Target Channel ID: {channel_id}")
+        if dashboard_channels:
+            print(f"📋 Multi-guild dashboards: {len(dashboard_channels)}")
+        print(f"⏱️  Update Interval: adaptive, {config.update_interval_min}s to {config.update_interval_max}s")
+        if config.api_port:
+            print(f"🌐 Live API: http://{config.api_host}:{config.api_port}/api/status")
         print("🔄 Bot is starting up...")
         
         # Run the bot
-        bot.run(bot_token)
+        bot.run(bot_token, log_handler=None)  # bot.py sets up the queued JSON logging
         
     except KeyboardInterrupt:
         print("\n🛑 Bot stopped by user")
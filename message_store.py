@@ -0,0 +1,45 @@
+"""
+Persisted dashboard message IDs
+Lets the bot keep editing the same dashboard messages across restarts
+"""
+
+import json
+import os
+from typing import Dict, Optional
+from persistence import atomic_write_json
+
+class DashboardMessageStore:
+    """Maps dashboard channel IDs to the message ID of their dashboard"""
+
+    def __init__(self, data_file: str = "dashboard_messages.json"):
+        self.data_file = data_file
+        self.messages = self._load_data()
+
+    def _load_data(self) -> Dict[int, int]:
+        """Load channel -> message IDs from file"""
+        if os.path.exists(self.data_file):
+            try:
+                with open(self.data_file, 'r') as f:
+                    return {int(channel_id): int(message_id) for channel_id, message_id in json.load(f).items()}
+            except (json.JSONDecodeError, FileNotFoundError, ValueError, AttributeError):
+                pass
+        return {}
+
+    def _save_data(self):
+        """Save the mapping, replacing the file atomically"""
+        atomic_write_json(self.data_file, {str(channel_id): message_id for channel_id, message_id in self.messages.items()})
+
+    def get_message_id(self, channel_id: int) -> Optional[int]:
+        """Last known dashboard message in a channel"""
+        return self.messages.get(channel_id)
+
+    def set_message_id(self, channel_id: int, message_id: int):
+        """Remember the dashboard message of a channel (writes only on change)"""
+        if self.messages.get(channel_id) != message_id:
+            self.messages[channel_id] = message_id
+            self._save_data()
+
+    def forget(self, channel_id: int):
+        """Drop a channel whose dashboard message no longer exists"""
+        if self.messages.pop(channel_id, None) is not None:
+            self._save_data()
@@ -0,0 +1,229 @@
+"""
+In-process metrics
+Minimal counters, gauges and histograms rendered in the Prometheus text exposition format
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    """Render {a="1",b="2"} (empty when there are no labels)"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    """Integers without a trailing .0, infinities the way Prometheus spells them"""
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class _Metric:
+    """Shared label handling; one value per label combination"""
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """Label values in declaration order"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        """Exposition lines including HELP and TYPE"""
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}", *self._samples()]
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    TYPE = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """Add to the count of one label combination"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        """Current value of one label combination"""
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Gauge(_Metric):
+    """Value that goes up and down, set directly or read from a callback at scrape time"""
+
+    TYPE = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        """Set the value of one label combination"""
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """Read the value from ``function`` whenever metrics are scraped"""
+        self._functions[self._key(labels)] = function
+
+    def _samples(self) -> Iterator[str]:
+        values = dict(self._values)
+        for key, function in list(self._functions.items()):
+            try:
+                values[key] = function()
+            except Exception:
+                continue  # A broken callback must not break the whole scrape
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    TYPE = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        """Record one observation"""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            counts[index] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> Iterator[str]:
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), self._counts[key]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(round(self._sums[key], 6))}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        """Add a metric; names must be unique"""
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Whole registry in the text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# Dashboard pipeline
+DASHBOARD_STAGE_SECONDS = Histogram(
+    "paranoia_dashboard_stage_seconds",
+    "Time spent in each stage of a dashboard update (restore, prepare, collect, persist, growth, build, send)", ["stage"]
+)
+SLOW_TICKS = Counter(
+    "paranoia_slow_ticks_total", "Dashboard ticks slower than the slow-tick threshold", ["tick"]
+)
+DASHBOARD_UPDATES = Counter(
+    "paranoia_dashboard_updates_total", "Dashboard update attempts by outcome", ["result"]
+)
+DASHBOARD_FALLBACKS = Counter(
+    "paranoia_dashboard_fallbacks_total", "Edits that fell back to sending a new message", ["reason"]
+)
+
+UPDATE_INTERVAL_SECONDS = Gauge(
+    "paranoia_update_interval_seconds", "Current adaptive refresh interval per dashboard channel", ["channel"]
+)
+
+DASHBOARD_FIRST_RENDER_SECONDS = Gauge(
+    "paranoia_dashboard_first_render_seconds",
+    "Seconds from process start to a guild's first dashboard render, from last-known and from live data",
+    ["guild", "source"]
+)
+
+# Discord rate limits
+RATE_LIMITS = Counter(
+    "paranoia_rate_limits_total", "Rate limits that deferred a dashboard update", ["source"]
+)
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "paranoia_rate_limit_wait_seconds", "Retry-After delays imposed by Discord",
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600)
+)
+
+# Outbound write queues
+WRITE_QUEUE_DEPTH = Gauge(
+    "paranoia_write_queue_depth", "Discord writes waiting or in flight per dashboard channel", ["channel"]
+)
+WRITE_QUEUE_WRITES = Counter(
+    "paranoia_write_queue_writes_total",
+    "Queued Discord writes by outcome (written, dropped for a newer write, retried, failed)", ["result"]
+)
+
+# Gateway
+GATEWAY_EVENTS = Counter(
+    "paranoia_gateway_events_total", "Gateway events received by type", ["event"]
+)
+
+# Logging
+LOG_LINES_SUPPRESSED = Counter(
+    "paranoia_log_lines_suppressed_total", "Log lines dropped by per-event sampling", ["event"]
+)
+
+# Persistence
+SNAPSHOT_WRITER = Gauge(
+    "paranoia_snapshot_writer", "Background snapshot writer queue and totals", ["value"]
+)
@@ -0,0 +1,118 @@
+"""
+Background persistence
+Moves snapshot writes off the asyncio event loop and batches them
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+def atomic_write_json(path: str, data: Any, indent: int = 2):
+    """Replace a JSON file atomically: write a temp file, fsync it, rename it over the target"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+class LatestOnly:
+    """SnapshotWriter destination for state that is replaced rather than appended: a batch saves only its newest record"""
+
+    def __init__(self, save: Callable[[Dict], None]):
+        self.save = save
+
+    def append_many(self, items: List[Tuple[Dict, datetime]]):
+        """Writer entry point"""
+        self.save(items[-1][0])
+
+class SnapshotWriter:
+    """Dedicated thread that takes snapshots from a queue and flushes them in batches"""
+
+    _STOP = object()
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 2.0):
+        self.batch_size = batch_size  # Flush once this many records are waiting
+        self.flush_interval = flush_interval  # ...or once the oldest waited this long (seconds)
+
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, log, record: Dict, now: datetime):
+        """Queue a record for a SnapshotLog/SQLiteSnapshotLog; never blocks the caller"""
+        self._queue.put((log, record, now))
+
+    def pending(self) -> int:
+        """Records waiting to be written"""
+        return self._queue.qsize()
+
+    def close(self, timeout: float = 10.0):
+        """Flush everything still queued and stop the thread"""
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"⚠️  Snapshot writer did not drain within {timeout}s ({self.pending()} pending)")
+
+    def _run(self):
+        """Collect records into batches by size or age and write them"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+
+    def _write(self, batch: List[Tuple[Any, Dict, datetime]]):
+        """Group a batch by destination log and append each group in one call"""
+        grouped: Dict[int, Tuple[Any, List[Tuple[Dict, datetime]]]] = {}
+        for log, record, now in batch:
+            grouped.setdefault(id(log), (log, []))[1].append((record, now))
+
+        for log, items in grouped.values():
+            try:
+                log.append_many(items)
+                self.written += len(items)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"❌ Failed to persist {len(items)} snapshot(s): {e}")
+        self.batches += 1
@@ -0,0 +1,150 @@
+"""
+Incremental member and presence counters
+Keeps per-guild totals up to date from gateway events instead of rescanning members
+"""
+
+import logging
+from typing import Dict, Optional
+import discord
+
+logger = logging.getLogger(__name__)
+
+class PresenceCounter:
+    """Running member/status totals for a single guild"""
+
+    STATUSES = ('online', 'idle', 'dnd', 'offline')
+
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.total_members = 0
+        self.total_bots = 0
+        self.status_counts = {status: 0 for status in self.STATUSES}
+        self.total_online = 0
+        self.seeded = False
+
+    def seed(self, guild: discord.Guild):
+        """Rebuild all counts with one pass over the member cache"""
+        self._reset()
+        for member in guild.members:
+            self.add(member)
+        self.seeded = True
+
+    def add(self, member: discord.Member):
+        """Account for a member entering the guild"""
+        self._apply(member, 1)
+
+    def remove(self, member: discord.Member):
+        """Account for a member leaving the guild"""
+        self._apply(member, -1)
+
+    def update(self, before: discord.Member, after: discord.Member):
+        """Apply the status delta between two versions of a member"""
+        if before.bot or str(before.status) == str(after.status):
+            return
+        self._apply_status(str(before.status), -1)
+        self._apply_status(str(after.status), 1)
+
+    def reconcile(self, guild: discord.Guild) -> Dict[str, int]:
+        """Rescan the guild and return how far the running counts had drifted"""
+        expected = PresenceCounter(self.guild_id)
+        expected.seed(guild)
+
+        current, actual = self.as_dict(), expected.as_dict()
+        drift = {key: current[key] - actual[key] for key in actual if current[key] != actual[key]}
+
+        self.total_members = expected.total_members
+        self.total_bots = expected.total_bots
+        self.status_counts = dict(expected.status_counts)
+        self.total_online = expected.total_online
+        self.seeded = True
+        return drift
+
+    def as_dict(self) -> Dict[str, int]:
+        """Flatten the counters for comparisons and logging"""
+        return {
+            'total_members': self.total_members,
+            'total_bots': self.total_bots,
+            'total_online': self.total_online,
+            **self.status_counts
+        }
+
+    def get_status_counts(self) -> Dict[str, int]:
+        """Status counts in the same shape as BotUtils.get_member_status_counts"""
+        return {**self.status_counts, 'total_online': self.total_online}
+
+    def _reset(self):
+        """Zero every counter"""
+        self.total_members = 0
+        self.total_bots = 0
+        self.status_counts = {status: 0 for status in self.STATUSES}
+        self.total_online = 0
+
+    def _apply(self, member: discord.Member, delta: int):
+        """Add or subtract one member from the totals"""
+        if member.bot:
+            self.total_bots += delta
+            return
+        self.total_members += delta
+        self._apply_status(str(member.status), delta)
+
+    def _apply_status(self, status: str, delta: int):
+        """Add or subtract one human member from a status bucket"""
+        if status in self.status_counts:
+            self.status_counts[status] += delta
+
+        # Count as online if not offline
+        if status != 'offline':
+            self.total_online += delta
+
+class PresenceTracker:
+    """Holds one PresenceCounter per guild and routes gateway events to it"""
+
+    def __init__(self):
+        self.counters: Dict[int, PresenceCounter] = {}
+
+    def get_counter(self, guild: discord.Guild) -> PresenceCounter:
+        """Return the guild's counter, seeding it from the member cache on first use"""
+        counter = self.counters.get(guild.id)
+        if counter is None:
+            counter = PresenceCounter(guild.id)
+            self.counters[guild.id] = counter
+        if not counter.seeded:
+            counter.seed(guild)
+        return counter
+
+    def invalidate(self, guild_id: Optional[int] = None):
+        """Force a reseed, e.g. after the gateway session was re-identified"""
+        if guild_id is None:
+            self.counters.clear()
+        else:
+            self.counters.pop(guild_id, None)
+
+    def on_member_join(self, member: discord.Member):
+        """Count a member that just joined"""
+        counter = self.counters.get(member.guild.id)
+        if counter and counter.seeded:
+            counter.add(member)
+
+    def on_member_remove(self, member: discord.Member):
+        """Uncount a member that just left"""
+        counter = self.counters.get(member.guild.id)
+        if counter and counter.seeded:
+            counter.remove(member)
+
+    def on_status_change(self, before: discord.Member, after: discord.Member):
+        """Move a member between status buckets"""
+        counter = self.counters.get(after.guild.id)
+        if counter and counter.seeded:
+            counter.update(before, after)
+
+    def reconcile(self, guild: discord.Guild) -> Dict[str, int]:
+        """Full-scan reconciliation for one guild, logging any drift found"""
+        counter = self.counters.get(guild.id)
+        if counter is None or not counter.seeded:
+            self.get_counter(guild)
+            return {}
+
+        drift = counter.reconcile(guild)
+        if drift:
+            logger.warning(f"⚠️  Presence counter drift in {guild.name}: {drift}")
+        return drift
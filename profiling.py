@@ -0,0 +1,128 @@
+"""
+Tick profiling
+Per-stage timing of every dashboard tick, slow-tick logging and on-demand cProfile captures
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional
+from metrics import DASHBOARD_STAGE_SECONDS, SLOW_TICKS
+
+logger = logging.getLogger(__name__)
+
+# Stage durations of the tick running in the current task
+_tick_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("tick_stages", default=None)
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time one stage into the stage histogram and the running tick's breakdown"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        DASHBOARD_STAGE_SECONDS.observe(elapsed, stage=stage)
+        stages = _tick_stages.get()
+        if stages is not None:
+            stages[stage] = stages.get(stage, 0.0) + elapsed
+
+class TickProfiler:
+    """Logs slow ticks with their stage breakdown and profiles the next N ticks when asked to"""
+
+    def __init__(self, directory: str = "profiles", slow_threshold: float = 1.0, default_ticks: int = 10):
+        self.directory = directory
+        self.slow_threshold = slow_threshold  # Seconds; slower ticks are logged with their stages
+        self.default_ticks = default_ticks
+        self.slow_ticks = 0
+        self.last_capture: Optional[str] = None  # Path of the newest profile written
+
+        self._profile: Optional[cProfile.Profile] = None
+        self._remaining = 0  # Ticks left to profile; the capture starts with the next one
+
+    def request(self, ticks: Optional[int] = None) -> int:
+        """Profile the next ``ticks`` ticks (and everything the event loop runs in between)"""
+        if self._remaining:
+            return self._remaining
+        self._remaining = max(1, ticks or self.default_ticks)
+        logger.info(f"🔬 Profiling the next {self._remaining} dashboard tick(s)")
+        return self._remaining
+
+    def get_status(self) -> Dict:
+        """Capture state for the admin endpoint"""
+        return {
+            'capturing': self._profile is not None,
+            'remaining_ticks': self._remaining,
+            'slow_threshold_seconds': self.slow_threshold,
+            'slow_ticks': self.slow_ticks,
+            'last_capture': self.last_capture
+        }
+
+    @contextmanager
+    def tick(self, name: str, label: str = "", counted: bool = True):
+        """Measure one tick; ``counted`` ticks advance a pending capture"""
+        if counted and self._remaining and self._profile is None:
+            self._start_capture()
+
+        stages: Dict[str, float] = {}
+        token = _tick_stages.set(stages)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            _tick_stages.reset(token)
+            if elapsed >= self.slow_threshold:
+                self._log_slow_tick(name, label, elapsed, stages)
+            if counted and self._profile is not None:
+                self._remaining -= 1
+                if self._remaining <= 0:
+                    self._finish_capture()
+
+    def _log_slow_tick(self, name: str, label: str, elapsed: float, stages: Dict[str, float]):
+        """Warn about a slow tick with the time spent in each stage"""
+        self.slow_ticks += 1
+        SLOW_TICKS.inc(tick=name)
+        other = max(0.0, elapsed - sum(stages.values()))
+        breakdown = ", ".join(f"{stage} {seconds * 1000:.0f}ms" for stage, seconds in
+                              sorted(stages.items(), key=lambda item: item[1], reverse=True))
+        breakdown = f"{breakdown}, other {other * 1000:.0f}ms" if breakdown else f"other {other * 1000:.0f}ms"
+        logger.warning(f"🐢 Slow {name} tick{f' for {label}' if label else ''}: {elapsed * 1000:.0f}ms ({breakdown})")
+
+    def _start_capture(self):
+        """Enable cProfile for the whole event loop thread"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler is already active on this thread
+            logger.warning(f"⚠️  Could not start profiling: {e}")
+            self._remaining = 0
+            return
+        self._profile = profile
+
+    def _finish_capture(self):
+        """Stop profiling and write the raw profile plus a readable summary"""
+        profile, self._profile = self._profile, None
+        self._remaining = 0
+        profile.disable()
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"ticks-{datetime.now().strftime('%Y%m%d-%H%M%S')}.prof")
+        try:
+            profile.dump_stats(path)
+            summary = io.StringIO()
+            pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(40)
+            with open(path[:-len(".prof")] + ".txt", "w") as f:
+                f.write(summary.getvalue())
+        except OSError as e:
+            logger.error(f"❌ Could not write profile {path}: {e}")
+            return
+        self.last_capture = path
+        logger.info(f"🔬 Profile written to {path} (open with `python -m pstats {path}`)")
@@ -0,0 +1,204 @@
+"""
+Multi-resolution rollups for growth metrics
+Keeps minute, hour and day aggregates in bounded ring buffers updated in O(1)
+"""
+
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+class RingBuffer:
+    """Fixed-capacity buffer that overwrites its oldest item when full"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._items: List[Any] = [None] * capacity
+        self._start = 0
+        self._size = 0
+
+    def append(self, item: Any):
+        """Add an item, evicting the oldest one if the buffer is full"""
+        end = (self._start + self._size) % self.capacity
+        self._items[end] = item
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> Any:
+        """Logical indexing, 0 is the oldest item and -1 the newest"""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ring buffer index out of range")
+        return self._items[(self._start + index) % self.capacity]
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(self._size):
+            yield self[index]
+
+class Bucket:
+    """Aggregate of every sample that fell into one time bucket"""
+
+    __slots__ = ('start', 'count', 'total', 'min', 'max', 'first', 'last')
+
+    def __init__(self, start: float, value: float):
+        self.start = start
+        self.count = 1
+        self.total = value
+        self.min = value
+        self.max = value
+        self.first = value
+        self.last = value
+
+    def add(self, value: float, newest: bool = True):
+        """Fold one more sample into the bucket; ``newest`` is False for a sample that arrived late"""
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if newest:
+            self.last = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count
+
+    def as_dict(self) -> Dict[str, float]:
+        """Serializable view of the bucket"""
+        return {
+            'start': self.start,
+            'min': self.min,
+            'max': self.max,
+            'mean': round(self.mean, 2),
+            'first': self.first,
+            'last': self.last,
+            'count': self.count
+        }
+
+class RollupTier:
+    """One resolution of a series: closed buckets in a ring buffer plus the open bucket"""
+
+    def __init__(self, width: int, capacity: int, offset: int = 0):
+        self.width = width  # Bucket width in seconds
+        self.offset = offset  # Shifts bucket boundaries, e.g. to align days with local midnight
+        self.buckets = RingBuffer(capacity)
+        self.current: Optional[Bucket] = None
+        self.late = 0  # Out-of-order samples folded into the open bucket
+
+    def bucket_start(self, ts: float) -> float:
+        """Start of the bucket that contains ``ts``"""
+        return ts - (ts + self.offset) % self.width
+
+    def add(self, ts: float, value: float):
+        """Add a sample; buckets stay in time order even if samples do not"""
+        start = self.bucket_start(ts)
+        if self.current is not None and start == self.current.start:
+            self.current.add(value)
+            return
+        if self.current is not None and start < self.current.start:
+            # Clock stepped back or unsorted import: reopening an older bucket would break the bisection
+            self.late += 1
+            self.current.add(value, newest=False)
+            return
+        if self.current is not None:
+            self.buckets.append(self.current)
+        self.current = Bucket(start, value)
+
+    def __len__(self) -> int:
+        return len(self.buckets) + (1 if self.current else 0)
+
+    def __getitem__(self, index: int) -> Bucket:
+        """Index over closed buckets followed by the open one"""
+        size = len(self)
+        if index < 0:
+            index += size
+        if self.current is not None and index == size - 1:
+            return self.current
+        return self.buckets[index]
+
+    def oldest(self) -> Optional[Bucket]:
+        return self[0] if len(self) else None
+
+    def newest(self) -> Optional[Bucket]:
+        return self.current
+
+    def find(self, ts: float) -> Optional[Bucket]:
+        """Latest bucket starting at or before ``ts`` (binary search, O(log n))"""
+        index = self._bisect(ts)
+        return self[index - 1] if index else None
+
+    def range(self, start: float, end: float) -> List[Bucket]:
+        """Buckets that overlap [start, end]"""
+        index = max(self._bisect(start) - 1, 0)
+        result = []
+        while index < len(self) and self[index].start <= end:
+            result.append(self[index])
+            index += 1
+        return result
+
+    def _bisect(self, ts: float) -> int:
+        """Number of buckets that start at or before ``ts``"""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[mid].start <= ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+class RollupSeries:
+    """A metric stored at minute, hour and day resolution"""
+
+    RESOLUTIONS = {
+        # name: (bucket width in seconds, number of buckets kept)
+        'minute': (60, 6 * 60),       # 6 hours of raw minutes
+        'hour': (3600, 14 * 24),      # 14 days of hours
+        'day': (86400, 365)           # one year of days
+    }
+
+    def __init__(self):
+        utc_offset = time.localtime().tm_gmtoff
+        self.tiers: Dict[str, RollupTier] = {
+            name: RollupTier(width, capacity, offset=utc_offset if width >= 86400 else 0)
+            for name, (width, capacity) in self.RESOLUTIONS.items()
+        }
+
+    @classmethod
+    def retention(cls, resolution: str) -> float:
+        """Seconds of history a resolution keeps"""
+        width, capacity = cls.RESOLUTIONS[resolution]
+        return width * capacity
+
+    def add(self, ts: float, value: float, tiers: Optional[List[str]] = None):
+        """Record a sample in every tier (or only the given ones)"""
+        for name in tiers or self.tiers:
+            self.tiers[name].add(ts, value)
+
+    def latest(self) -> Optional[float]:
+        """Most recent sample"""
+        bucket = self.tiers['minute'].newest()
+        return bucket.last if bucket else None
+
+    def value_at(self, ts: float) -> Optional[float]:
+        """Best-resolution value at a past time, using the finest tier that covers it"""
+        for tier in self.tiers.values():
+            oldest = tier.oldest()
+            if oldest is not None and oldest.start <= ts:
+                bucket = tier.find(ts)
+                # Inside a bucket only its first sample is known to predate ``ts``
+                return bucket.last if ts >= bucket.start + tier.width else bucket.first
+        return None
+
+    def oldest(self, resolution: str = 'day') -> Optional[Bucket]:
+        """Oldest bucket retained at a resolution"""
+        return self.tiers[resolution].oldest()
+
+    def buckets(self, resolution: str, start: float, end: float) -> List[Bucket]:
+        """Buckets of a resolution within a time range"""
+        return self.tiers[resolution].range(start, end)
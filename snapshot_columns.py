@@ -0,0 +1,108 @@
+"""
+Columnar in-memory snapshot storage
+Keeps one guild's snapshots in typed arrays instead of one dict per snapshot
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from itertools import repeat
+from operator import truediv
+from statistics import fmean
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+class SnapshotRow(Mapping):
+    """Read-only dict-like view of one snapshot; derived fields are computed on access"""
+
+    __slots__ = ('_columns', '_index')
+
+    KEYS = ("timestamp", "guild_id", "total_members", "online_members", "date", "hour")
+
+    def __init__(self, columns: "SnapshotColumns", index: int):
+        self._columns = columns
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        columns, index = self._columns, self._index
+        if key == "total_members":
+            return columns.total_members[index]
+        if key == "online_members":
+            return columns.online_members[index]
+        if key == "guild_id":
+            return columns.guild_id
+        if key == "timestamp":
+            return columns.datetime_at(index).isoformat()
+        if key == "date":
+            return columns.datetime_at(index).strftime("%Y-%m-%d")
+        if key == "hour":
+            return columns.datetime_at(index).hour
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return f"SnapshotRow({dict(self)})"
+
+class SnapshotColumns(Sequence):
+    """Time-ordered snapshots of one guild stored as parallel typed arrays"""
+
+    def __init__(self, guild_id: int):
+        # The guild ID is interned once per store instead of repeated in every row
+        self.guild_id = guild_id
+        self.timestamps = array('d')  # epoch seconds
+        self.total_members = array('q')
+        self.online_members = array('q')
+
+    def append(self, ts: float, total_members: int, online_members: int):
+        """Add a snapshot; timestamps must not go backwards"""
+        self.timestamps.append(ts)
+        self.total_members.append(total_members)
+        self.online_members.append(online_members)
+
+    def append_snapshot(self, snapshot: Dict):
+        """Add a snapshot given in the journal's dict format"""
+        self.append(
+            datetime.fromisoformat(snapshot["timestamp"]).timestamp(),
+            snapshot["total_members"],
+            snapshot["online_members"]
+        )
+
+    def drop_before(self, cutoff: float):
+        """Drop every snapshot at or before ``cutoff`` (binary search + one memmove)"""
+        expired = bisect_right(self.timestamps, cutoff)
+        if expired:
+            del self.timestamps[:expired]
+            del self.total_members[:expired]
+            del self.online_members[:expired]
+
+    def window(self, start: float, end: float) -> Tuple[int, int]:
+        """Index range [lo, hi) of snapshots with start <= ts <= end (two binary searches)"""
+        return bisect_left(self.timestamps, start), bisect_right(self.timestamps, end)
+
+    def mean_online_ratio(self, lo: int, hi: int) -> float:
+        """Average online/total ratio over an index range, computed column-wise without per-row Python code"""
+        if hi <= lo:
+            return 0.0
+        totals = map(max, self.total_members[lo:hi], repeat(1))
+        return fmean(map(truediv, self.online_members[lo:hi], totals))
+
+    def datetime_at(self, index: int) -> datetime:
+        """Timestamp of one snapshot as a local datetime"""
+        return datetime.fromtimestamp(self.timestamps[index])
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SnapshotRow, List[SnapshotRow]]:
+        if isinstance(index, slice):
+            return [SnapshotRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("snapshot index out of range")
+        return SnapshotRow(self, index)
@@ -0,0 +1,275 @@
+"""
+Append-only snapshot journal
+Stores growth snapshots as JSON lines split into time-based segment files
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Layout of the bot's journals; readers must open them exactly as GrowthTracker writes them
+JOURNALS = {
+    'daily': {'retention': timedelta(days=7)},  # Hourly segments, compacted per day
+    'weekly': {'retention': timedelta(days=30), 'segment_format': "%Y-%m", 'compact_format': None}
+}
+
+class SnapshotLog:
+    """Segmented, line-oriented journal of growth snapshots"""
+
+    SEGMENT_SUFFIX = ".jsonl"
+
+    def __init__(self, directory: str, retention: timedelta,
+                 segment_format: str = "%Y-%m-%dT%H",
+                 compact_format: Optional[str] = "%Y-%m-%d"):
+        self.directory = directory
+        self.retention = retention
+        self.segment_format = segment_format
+        self.compact_format = compact_format
+
+        self._handle = None
+        self._handle_key: Optional[str] = None
+        self._maintenance_lock = threading.Lock()
+        self._maintenance_thread: Optional[threading.Thread] = None
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def append(self, record: Dict, now: datetime):
+        """Append one record to the segment covering ``now``"""
+        self._write_line(record, now)
+        self._handle.flush()
+
+    def append_many(self, items: List[Tuple[Dict, datetime]]):
+        """Append a batch of (record, now) pairs with one flush + fsync per touched segment"""
+        for record, now in items:
+            key = now.strftime(self.segment_format)
+            if key != self._handle_key and self._handle:
+                self._sync()
+            self._write_line(record, now)
+        if self._handle:
+            self._sync()
+
+    def _write_line(self, record: Dict, now: datetime):
+        """Write one JSON line to the segment covering ``now``"""
+        key = now.strftime(self.segment_format)
+        if key != self._handle_key:
+            self._rotate(key, now)
+        self._handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def _sync(self):
+        """Make everything written to the open segment durable"""
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def import_records(self, records: List[Dict]):
+        """Bulk-write records (e.g. from the legacy JSON file) into their segments"""
+        self.close()
+        grouped: Dict[str, List[str]] = {}
+        for record in records:
+            key = datetime.fromisoformat(record["timestamp"]).strftime(self.segment_format)
+            grouped.setdefault(key, []).append(json.dumps(record, separators=(",", ":")))
+
+        for key, lines in grouped.items():
+            with open(self._path(key), 'a') as f:
+                f.write("\n".join(lines) + "\n")
+
+    def replay(self, since: datetime) -> Iterator[Dict]:
+        """Yield every record newer than ``since`` in write order"""
+        for key, _ in self._live_segments(since):
+            for record in self._read_segment(key):
+                if datetime.fromisoformat(record["timestamp"]) > since:
+                    yield record
+
+    def latest(self, guild_id: Optional[int] = None) -> Optional[Dict]:
+        """Return the most recent record, optionally for one guild, without reading the whole journal"""
+        for key, _ in reversed(self._segments()):
+            if guild_id is None:
+                record = self._read_last_line(self._path(key))
+            else:
+                record = None
+                for candidate in self._read_segment(key):
+                    if candidate.get("guild_id") == guild_id:
+                        record = candidate
+            if record is not None:
+                return record
+        return None
+
+    def is_empty(self) -> bool:
+        """Check whether the journal has any segments yet"""
+        return not self._segments()
+
+    def run_maintenance(self, now: datetime, background: bool = True):
+        """Drop expired segments and compact closed ones"""
+        if not background:
+            self._maintain(now)
+            return
+
+        if self._maintenance_thread and self._maintenance_thread.is_alive():
+            return  # A pass is already running, the next rotation will catch up
+
+        self._maintenance_thread = threading.Thread(
+            target=self._maintain, args=(now,), name="snapshot-log-maintenance", daemon=True
+        )
+        self._maintenance_thread.start()
+
+    def close(self):
+        """Close the open segment handle"""
+        if self._handle:
+            self._handle.close()
+        self._handle = None
+        self._handle_key = None
+
+    def _rotate(self, key: str, now: datetime):
+        """Switch appends to a new segment and schedule maintenance"""
+        previous_key = self._handle_key
+        self.close()
+        self._handle = open(self._path(key), 'a')
+        self._handle_key = key
+
+        if previous_key is not None:
+            self.run_maintenance(now)
+
+    def _maintain(self, now: datetime):
+        """Retention and compaction pass (runs off the hot path)"""
+        with self._maintenance_lock:
+            self._drop_expired(now - self.retention)
+            self._compact(now)
+
+    def _drop_expired(self, cutoff: datetime):
+        """Delete whole segments whose records are all older than ``cutoff``"""
+        segments = self._segments()
+        # A segment is fully expired once the segment after it starts before the cutoff
+        for (key, _), (_, next_start) in zip(segments, segments[1:]):
+            if next_start <= cutoff:
+                os.remove(self._path(key))
+
+    def _compact(self, now: datetime):
+        """Merge fine-grained segments of closed periods into one segment each"""
+        if not self.compact_format:
+            return
+
+        current = now.strftime(self.compact_format)
+        pending: Dict[str, List[str]] = {}
+        for key, start in self._segments(include_shadowed=True):
+            compact_key = start.strftime(self.compact_format)
+            if key != compact_key and compact_key < current:
+                pending.setdefault(compact_key, []).append(key)
+
+        for compact_key, keys in pending.items():
+            target = self._path(compact_key)
+            # An existing target means the sources were either written after it was compacted
+            # (clock stepped back) or already merged before a crash; lines it holds are not copied twice
+            existing = set()
+            tmp_path = target + ".tmp"
+            with open(tmp_path, 'w') as out:
+                if os.path.exists(target):
+                    with open(target, 'r') as f:
+                        for line in f:
+                            line = line.rstrip("\n")
+                            existing.add(line)
+                            out.write(line + "\n")
+                for key in sorted(keys):
+                    with open(self._path(key), 'r') as f:
+                        for line in f:
+                            line = line.rstrip("\n")
+                            if line and line not in existing:
+                                out.write(line + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, target)
+
+            # Source segments are only removed once the compacted one is durable
+            for key in keys:
+                os.remove(self._path(key))
+
+    def _segments(self, include_shadowed: bool = False) -> List[Tuple[str, datetime]]:
+        """List segment keys with their start times, oldest first"""
+        keys = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SEGMENT_SUFFIX):
+                key = name[:-len(self.SEGMENT_SUFFIX)]
+                start = self._parse_key(key)
+                if start is not None:
+                    keys.append((key, start))
+        keys.sort(key=lambda item: (item[1], item[0]))
+
+        if include_shadowed or not self.compact_format:
+            return keys
+
+        # Ignore leftovers of a compaction that was interrupted after the rename
+        compacted = {key for key, _ in keys if self._is_compacted(key)}
+        return [
+            (key, start) for key, start in keys
+            if self._is_compacted(key) or start.strftime(self.compact_format) not in compacted
+        ]
+
+    def _live_segments(self, since: datetime) -> List[Tuple[str, datetime]]:
+        """Segments that may contain records newer than ``since``"""
+        segments = self._segments()
+        return [
+            segment for segment, following in zip(segments, segments[1:] + [None])
+            if following is None or following[1] > since
+        ]
+
+    def _is_compacted(self, key: str) -> bool:
+        """Check whether a key names a compacted segment"""
+        return self._try_parse(key, self.compact_format) is not None
+
+    def _parse_key(self, key: str) -> Optional[datetime]:
+        """Parse a segment key in either the fine or the compacted format"""
+        start = self._try_parse(key, self.segment_format)
+        if start is None and self.compact_format:
+            start = self._try_parse(key, self.compact_format)
+        return start
+
+    @staticmethod
+    def _try_parse(key: str, fmt: Optional[str]) -> Optional[datetime]:
+        """strptime that returns None instead of raising"""
+        if not fmt:
+            return None
+        try:
+            return datetime.strptime(key, fmt)
+        except ValueError:
+            return None
+
+    def _path(self, key: str) -> str:
+        """Path of a segment file"""
+        return os.path.join(self.directory, key + self.SEGMENT_SUFFIX)
+
+    def _read_segment(self, key: str) -> Iterator[Dict]:
+        """Yield records from one segment, skipping a torn trailing line"""
+        try:
+            with open(self._path(key), 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            return  # Dropped by a concurrent maintenance pass
+
+    @staticmethod
+    def _read_last_line(path: str, chunk_size: int = 4096) -> Optional[Dict]:
+        """Read the last complete record of a file by seeking from the end"""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - chunk_size))
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+
+        for line in reversed(lines):
+            try:
+                return json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+        return None
+
+def open_journal(log_dir: str, name: str) -> SnapshotLog:
+    """Open the 'daily' or 'weekly' journal under ``log_dir`` with the layout it is written in"""
+    return SnapshotLog(os.path.join(log_dir, name), **JOURNALS[name])
@@ -0,0 +1,144 @@
+"""
+SQLite snapshot storage
+WAL-mode alternative to the JSON-lines journal, safe to read from the web dashboard while the bot writes
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+class SQLiteSnapshotLog:
+    """Snapshot table with the same interface as SnapshotLog"""
+
+    def __init__(self, db_path: str, table: str, retention: timedelta,
+                 batch_size: int = 1, readonly: bool = False):
+        self.db_path = db_path
+        self.table = table
+        self.retention = retention
+        self.batch_size = batch_size  # Rows buffered before an INSERT batch is committed
+        self.readonly = readonly
+
+        self._pending: List[Tuple[int, float, int, int]] = []
+        self._lock = threading.Lock()
+        self._last_maintenance_hour: Optional[str] = None
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating the table and indexes on first use"""
+        if self.readonly:
+            return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "guild_id INTEGER NOT NULL, ts REAL NOT NULL, "
+            "total_members INTEGER NOT NULL, online_members INTEGER NOT NULL)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_guild_ts ON {self.table} (guild_id, ts)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_ts ON {self.table} (ts)")
+        conn.commit()
+        return conn
+
+    def append(self, record: Dict, now: datetime):
+        """Buffer one record and write the batch once it is full"""
+        with self._lock:
+            self._pending.append(self._to_row(record, now.timestamp()))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+        # Retention runs at most once per hour, like segment rotation in the journal
+        hour = now.strftime("%Y-%m-%dT%H")
+        if hour != self._last_maintenance_hour:
+            self._last_maintenance_hour = hour
+            self.run_maintenance(now)
+
+    def append_many(self, items: List[Tuple[Dict, datetime]]):
+        """Insert a batch of (record, now) pairs in one transaction"""
+        with self._lock:
+            self._pending.extend(self._to_row(record, now.timestamp()) for record, now in items)
+            self._flush_locked()
+
+        now = items[-1][1]
+        hour = now.strftime("%Y-%m-%dT%H")
+        if hour != self._last_maintenance_hour:
+            self._last_maintenance_hour = hour
+            self.run_maintenance(now)
+
+    def import_records(self, records: List[Dict]):
+        """Bulk-insert records (legacy JSON file or journal migration) in one transaction"""
+        rows = [self._to_row(record) for record in records]
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT INTO {self.table} VALUES (?, ?, ?, ?)", rows)
+
+    def flush(self):
+        """Write any buffered rows"""
+        with self._lock:
+            self._flush_locked()
+
+    def replay(self, since: datetime) -> Iterator[Dict]:
+        """Yield every record newer than ``since`` in time order"""
+        self.flush()
+        cursor = self._conn.execute(
+            f"SELECT guild_id, ts, total_members, online_members FROM {self.table} "
+            "WHERE ts > ? ORDER BY ts", (since.timestamp(),)
+        )
+        for row in cursor:
+            yield self._to_record(row)
+
+    def latest(self, guild_id: Optional[int] = None) -> Optional[Dict]:
+        """Most recent record, optionally for one guild (index lookup)"""
+        query = f"SELECT guild_id, ts, total_members, online_members FROM {self.table}"
+        params: Tuple = ()
+        if guild_id is not None:
+            query += " WHERE guild_id = ?"
+            params = (guild_id,)
+        row = self._conn.execute(query + " ORDER BY ts DESC LIMIT 1", params).fetchone()
+        return self._to_record(row) if row else None
+
+    def is_empty(self) -> bool:
+        """Check whether the table has any rows yet"""
+        return self._conn.execute(f"SELECT 1 FROM {self.table} LIMIT 1").fetchone() is None
+
+    def run_maintenance(self, now: datetime, background: bool = True):
+        """Apply retention with a single range delete on the ts index"""
+        cutoff = (now - self.retention).timestamp()
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE ts <= ?", (cutoff,))
+
+    def close(self):
+        """Flush buffered rows and close the connection"""
+        if not self.readonly:
+            self.flush()
+        self._conn.close()
+
+    def _flush_locked(self):
+        """Insert the pending batch (caller holds the lock)"""
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(f"INSERT INTO {self.table} VALUES (?, ?, ?, ?)", self._pending)
+        self._pending = []
+
+    @staticmethod
+    def _to_row(record: Dict, ts: Optional[float] = None) -> Tuple[int, float, int, int]:
+        """Convert a journal-format record into a table row"""
+        if ts is None:
+            ts = datetime.fromisoformat(record["timestamp"]).timestamp()
+        return (record["guild_id"], ts, record["total_members"], record["online_members"])
+
+    @staticmethod
+    def _to_record(row: Tuple[int, float, int, int]) -> Dict:
+        """Convert a table row into the journal's record format"""
+        guild_id, ts, total_members, online_members = row
+        when = datetime.fromtimestamp(ts)
+        return {
+            "timestamp": when.isoformat(),
+            "guild_id": guild_id,
+            "total_members": total_members,
+            "online_members": online_members,
+            "date": when.strftime("%Y-%m-%d"),
+            "hour": when.hour
+        }
@@ -0,0 +1,144 @@
+"""
+Memory-mapped latest-state file
+The bot publishes the current per-guild stats into a fixed-layout file guarded by a seqlock,
+so other processes (the web dashboard) can read them in constant time without parsing history
+"""
+
+import logging
+import mmap
+import os
+import struct
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PCST"
+LAYOUT_VERSION = 1
+MAX_SLOTS = 64
+
+# magic, layout version, seqlock counter, content version, slots in use
+HEADER = struct.Struct("<4sIQQI4x")
+# guild_id, updated_at, total_members, online_members, members_in_voice, boost_count
+SLOT = struct.Struct("<Qdqqqq")
+FILE_SIZE = HEADER.size + SLOT.size * MAX_SLOTS
+
+SLOT_FIELDS = ("guild_id", "updated_at", "total_members", "online_members", "members_in_voice", "boost_count")
+
+class LatestStateWriter:
+    """Single writer that publishes per-guild stats into the state file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._slots: Dict[int, int] = {}
+        self._values: Dict[int, tuple] = {}
+        self.dropped_guilds = set()  # Guilds that found every slot taken
+
+        with open(path, "a+b") as f:
+            if os.fstat(f.fileno()).st_size != FILE_SIZE:
+                f.truncate(0)
+                f.truncate(FILE_SIZE)
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), FILE_SIZE)
+
+        magic, layout, seq, version, used = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or layout != LAYOUT_VERSION:
+            HEADER.pack_into(self._map, 0, MAGIC, LAYOUT_VERSION, 0, 0, 0)
+            used = 0
+        if seq % 2:
+            # A previous writer died mid-update; make the counter even again
+            HEADER.pack_into(self._map, 0, MAGIC, LAYOUT_VERSION, seq + 1, version, used)
+
+        # Keep existing guilds in their slots across restarts
+        for index in range(used):
+            fields = SLOT.unpack_from(self._map, HEADER.size + index * SLOT.size)
+            self._slots[fields[0]] = index
+            self._values[fields[0]] = fields[2:]
+
+    def publish(self, guild_id: int, total_members: int, online_members: int,
+                members_in_voice: int, boost_count: int, updated_at: Optional[datetime] = None) -> bool:
+        """Write one guild's stats; the content version only moves when a value changed"""
+        values = (total_members, online_members, members_in_voice, boost_count)
+        changed = self._values.get(guild_id) != values
+
+        index = self._slots.get(guild_id)
+        if index is None:
+            if len(self._slots) >= MAX_SLOTS:
+                if guild_id not in self.dropped_guilds:
+                    self.dropped_guilds.add(guild_id)
+                    logger.warning(f"⚠️  State file {self.path} is full ({MAX_SLOTS} guilds), "
+                                   f"guild {guild_id} is not published for the web dashboard")
+                return False
+            index = len(self._slots)
+            self._slots[guild_id] = index
+
+        _, _, seq, version, _ = HEADER.unpack_from(self._map, 0)
+        used = len(self._slots)
+
+        # Seqlock: an odd counter tells readers a write is in progress
+        HEADER.pack_into(self._map, 0, MAGIC, LAYOUT_VERSION, seq + 1, version, used)
+        SLOT.pack_into(
+            self._map, HEADER.size + index * SLOT.size,
+            guild_id, (updated_at or datetime.now()).timestamp(), *values
+        )
+        HEADER.pack_into(self._map, 0, MAGIC, LAYOUT_VERSION, seq + 2, version + int(changed), used)
+
+        self._values[guild_id] = values
+        return changed
+
+    def version(self) -> int:
+        """Content version; changes only when some published value changed"""
+        return HEADER.unpack_from(self._map, 0)[3]
+
+    def get(self, guild_id: int) -> Optional[Dict[str, int]]:
+        """Last values published for a guild, including those found in the file at startup"""
+        values = self._values.get(guild_id)
+        if values is None:
+            return None
+        return dict(zip(SLOT_FIELDS[2:], values))
+
+    def close(self):
+        """Unmap and close the file"""
+        self._map.close()
+        self._file.close()
+
+class LatestStateReader:
+    """Lock-free reader for the state file"""
+
+    MAX_RETRIES = 100
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), FILE_SIZE, access=mmap.ACCESS_READ)
+
+    def version(self) -> int:
+        """Content version; changes only when some published value changed"""
+        return HEADER.unpack_from(self._map, 0)[3]
+
+    def sequence(self) -> int:
+        """Publish counter; unlike version() it also moves when only a timestamp was refreshed"""
+        return HEADER.unpack_from(self._map, 0)[2]
+
+    def read(self, guild_id: Optional[int] = None) -> List[Dict]:
+        """Consistent copy of every slot (or only one guild's), retried while a write is in progress"""
+        for _ in range(self.MAX_RETRIES):
+            magic, layout, seq, version, used = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or layout != LAYOUT_VERSION:
+                return []
+            if seq % 2:
+                continue
+
+            rows = [SLOT.unpack_from(self._map, HEADER.size + index * SLOT.size) for index in range(used)]
+
+            if HEADER.unpack_from(self._map, 0)[2] == seq:
+                states = [dict(zip(SLOT_FIELDS, row), version=version) for row in rows]
+                if guild_id is not None:
+                    states = [state for state in states if state["guild_id"] == guild_id]
+                return states
+        raise RuntimeError("state file is being rewritten too often to get a consistent read")
+
+    def close(self):
+        """Unmap and close the file"""
+        self._map.close()
+        self._file.close()
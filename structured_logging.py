@@ -0,0 +1,146 @@
+"""
+Non-blocking structured logging
+Records are handed through a queue to a background thread, formatted there as JSON lines,
+and high-volume gateway events are sampled per event type with a summary of what was dropped
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+from metrics import LOG_LINES_SUPPRESSED
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_sampler: Optional["EventSampler"] = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including the fields passed with ``extra``"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc_info'] = record.exc_text
+        if record.stack_info:
+            payload['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+class EventSampler(logging.Filter):
+    """Lets at most ``burst`` records per event type through each ``interval`` seconds
+
+    Records are grouped by their ``event`` extra field; records without one always pass.
+    When a window closes, the number of suppressed lines is logged once per event type.
+    """
+
+    def __init__(self, burst: int = 20, interval: float = 10.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.suppressed_total = 0
+        self._windows: Dict[str, List[float]] = {}  # event -> [window start, passed, suppressed]
+        self._next_roll = time.monotonic() + interval
+        self._lock = threading.Lock()
+        self._summary_logger = logging.getLogger("log_sampling")
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = time.monotonic()
+        summaries = self._roll(now) if now >= self._next_roll else []
+        event = getattr(record, 'event', None)
+        passed = True
+        if event is not None:
+            with self._lock:
+                window = self._windows.get(event)
+                if window is None:
+                    window = self._windows[event] = [now, 0, 0]
+                if window[1] < self.burst:
+                    window[1] += 1
+                else:
+                    window[2] += 1
+                    self.suppressed_total += 1
+                    passed = False
+        self._report(summaries)
+        return passed
+
+    def flush(self):
+        """Report every open window's suppressed lines (at shutdown)"""
+        self._report(self._roll(time.monotonic(), force=True))
+
+    def _roll(self, now: float, force: bool = False) -> List[Tuple[str, int, float]]:
+        """Close expired windows; returns (event, suppressed, seconds) for those that dropped lines"""
+        summaries = []
+        with self._lock:
+            self._next_roll = now + self.interval
+            for event, window in self._windows.items():
+                if force or now - window[0] >= self.interval:
+                    if window[2]:
+                        summaries.append((event, int(window[2]), now - window[0]))
+                    window[:] = [now, 0, 0]
+        return summaries
+
+    def _report(self, summaries: List[Tuple[str, int, float]]):
+        """Log the summaries outside the lock (they pass through this filter again)"""
+        for event, suppressed, seconds in summaries:
+            LOG_LINES_SUPPRESSED.inc(suppressed, event=event)
+            self._summary_logger.warning(
+                "🤐 Suppressed %d '%s' log lines in the last %.0fs", suppressed, event, seconds,
+                extra={'event': 'log_suppressed', 'suppressed_event': event, 'suppressed': suppressed}
+            )
+
+class LazyQueueHandler(QueueHandler):
+    """Queues records unformatted so %-style messages are only rendered on the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the record (args, exc_info) can be passed as-is
+        return record
+
+def setup_logging(level: str = "INFO", json_format: bool = True, burst: int = 20,
+                  interval: float = 10.0) -> QueueListener:
+    """Route the root logger through a sampled queue to a background stderr writer (idempotent)"""
+    global _listener, _sampler
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+
+    _sampler = EventSampler(burst, interval)
+    queue_handler = LazyQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(_sampler)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+def shutdown_logging():
+    """Report suppressed lines and write out everything still queued"""
+    global _listener
+    if _sampler is not None:
+        _sampler.flush()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
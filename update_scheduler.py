@@ -0,0 +1,155 @@
+"""
+Coalescing dashboard update scheduler
+Merges bursts of update requests into single, paced renders
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+class UpdateScheduler:
+    """Marks the dashboard dirty and renders it at most once per burst"""
+
+    def __init__(self, render: Callable[[], Awaitable[bool]], min_interval: float,
+                 max_staleness: float, debounce: float):
+        self.render = render
+        self.min_interval = min_interval  # Minimum gap between two renders
+        self.max_staleness = max_staleness  # Longest a dirty dashboard may wait
+        self.debounce = debounce  # Quiet period that lets a burst settle
+
+        self.renders = 0  # Renders that actually ran
+        self.merged = 0  # Requests folded into an already pending render
+        self.skipped = 0  # Renders the callback declined (nothing to send, not ready)
+        self.rate_limited = 0  # Times a rate limit pushed the next render back
+
+        self._dirty_since: Optional[float] = None
+        self._last_render = float('-inf')
+        self._blocked_until = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background render loop"""
+        if not self.is_running():
+            self._task = asyncio.create_task(self._run(), name="dashboard-scheduler")
+
+    def stop(self):
+        """Cancel the background render loop"""
+        if self._task:
+            self._task.cancel()
+        self._task = None
+
+    def is_running(self) -> bool:
+        """Check whether the render loop is active"""
+        return self._task is not None and not self._task.done()
+
+    def mark_dirty(self, reason: str = "update"):
+        """Request a render; requests arriving before it runs are merged"""
+        if self._dirty_since is None:
+            self._dirty_since = self._now()
+            logger.debug(f"🧹 Dashboard marked dirty ({reason})")
+        else:
+            self.merged += 1
+        self._wakeup.set()
+
+    def defer(self, retry_after: float):
+        """Hold off every render until a rate limit has expired"""
+        self._blocked_until = max(self._blocked_until, self._now() + retry_after)
+        self.rate_limited += 1
+        logger.warning(f"⏳ Rate limited, next dashboard render in {retry_after:.1f}s")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters for logging and metrics"""
+        return {
+            'renders': self.renders,
+            'merged': self.merged,
+            'skipped': self.skipped,
+            'rate_limited': self.rate_limited,
+            'pending': int(self._dirty_since is not None)
+        }
+
+    def _due_at(self) -> float:
+        """Earliest time the pending render may run"""
+        due = max(self._last_render + self.min_interval, self._dirty_since + self.debounce)
+        due = min(due, self._dirty_since + self.max_staleness)
+        # Rate limits always win over the staleness bound
+        return max(due, self._blocked_until)
+
+    async def _run(self):
+        """Wait for dirty marks and render once they are due"""
+        while True:
+            await self._wakeup.wait()
+
+            # defer() may move the deadline while we sleep, so recheck each time
+            while (delay := self._due_at() - self._now()) > 0:
+                await asyncio.sleep(delay)
+
+            self._wakeup.clear()
+            self._dirty_since = None
+            self._last_render = self._now()
+
+            try:
+                rendered = await self.render()
+            except Exception as e:
+                logger.error(f"❌ Dashboard render failed: {e}")
+                rendered = False
+
+            if rendered:
+                self.renders += 1
+            else:
+                self.skipped += 1
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+class AdaptiveInterval:
+    """Refresh interval of one dashboard, driven by how fast its stats change
+
+    Backs off while the stats stay the same and tightens while they move faster than ``busy_rate``
+    changes per minute; slower movement keeps the current interval.
+    """
+
+    def __init__(self, initial: float, minimum: float, maximum: float, busy_rate: float,
+                 backoff: float = 1.5, tighten: float = 0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.busy_rate = busy_rate  # Summed stat changes per minute that count as busy
+        self.backoff = backoff  # Interval multiplier after an unchanged refresh
+        self.tighten = tighten  # Interval multiplier after a busy one
+        self.interval = min(maximum, max(minimum, initial))
+
+        self.failures = 0  # Consecutive refresh attempts that failed
+
+        self._last_values: Optional[Tuple[Optional[int], ...]] = None
+        self._last_refresh: Optional[float] = None
+
+    def observe(self, values: Sequence[Optional[int]], now: float) -> float:
+        """Adjust the interval after a refresh from how far the stats moved since the previous one"""
+        values = tuple(values)
+        if self._last_values is not None and now > self._last_refresh:
+            # Unknown (None) values, e.g. in counts-only mode, count as unchanged
+            changes = sum(abs(new - old) for new, old in zip(values, self._last_values)
+                          if new is not None and old is not None)
+            per_minute = changes * 60 / (now - self._last_refresh)
+            if changes == 0:
+                self.interval = min(self.maximum, self.interval * self.backoff)
+            elif per_minute >= self.busy_rate:
+                self.interval = max(self.minimum, self.interval * self.tighten)
+        self._last_values = values
+        self._last_refresh = now
+        self.failures = 0
+        return self.interval
+
+    def failed(self, now: float) -> float:
+        """Count a refresh attempt that failed, so the next one waits a full (backed off) interval"""
+        self.failures += 1
+        self.interval = min(self.maximum, self.interval * self.backoff)
+        self._last_refresh = now
+        return self.interval
+
+    def is_due(self, now: float) -> bool:
+        """Whether the interval has passed since the last refresh"""
+        return self._last_refresh is None or now - self._last_refresh >= self.interval
@@ -15,6 +15,14 @@ class BotUtils:
         now = datetime.now()
         return now.strftime("%m/%d/%Y %I:%M %p")
     
+    @staticmethod
+    def format_duration(seconds: float) -> str:
+        """Format a duration as 45s, 5m or 1m30s"""
+        minutes, seconds = divmod(int(seconds), 60)
+        if not minutes:
+            return f"{seconds}s"
+        return f"{minutes}m{seconds}s" if seconds else f"{minutes}m"
+    
     @staticmethod
     def format_number(number: int) -> str:
         """Format number with commas for readability"""
@@ -0,0 +1,160 @@
+"""
+Incremental voice occupancy index
+Tracks who is in which voice channel from voice state events, with per-channel sessions
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+import discord
+
+class ChannelOccupancy:
+    """Non-bot members of one voice channel plus its session history"""
+
+    MAX_SESSIONS = 50
+
+    def __init__(self, channel_id: int, name: str):
+        self.channel_id = channel_id
+        self.name = name
+        self.members: Set[int] = set()
+        self.session_started: Optional[datetime] = None
+        self.sessions: Deque[Tuple[datetime, datetime]] = deque(maxlen=self.MAX_SESSIONS)
+        self.member_seconds = 0.0  # Accumulated "time in voice" across all members
+        self.session_seconds = 0.0  # Accumulated time the channel was occupied
+        self._last_change: Optional[datetime] = None
+
+    def join(self, member_id: int, now: datetime) -> bool:
+        """Add a member, opening a session if the channel was empty"""
+        if member_id in self.members:
+            return False
+        self._accumulate(now)
+        if not self.members:
+            self.session_started = now
+        self.members.add(member_id)
+        return True
+
+    def leave(self, member_id: int, now: datetime) -> bool:
+        """Remove a member, closing the session if the channel is now empty"""
+        if member_id not in self.members:
+            return False
+        self._accumulate(now)
+        self.members.discard(member_id)
+        if not self.members and self.session_started:
+            self.sessions.append((self.session_started, now))
+            self.session_seconds += (now - self.session_started).total_seconds()
+            self.session_started = None
+        return True
+
+    def get_metrics(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Time-in-voice metrics for this channel, including the open session"""
+        now = now or datetime.now()
+        member_seconds = self.member_seconds
+        session_seconds = self.session_seconds
+        if self._last_change:
+            member_seconds += len(self.members) * (now - self._last_change).total_seconds()
+        if self.session_started:
+            session_seconds += (now - self.session_started).total_seconds()
+
+        return {
+            'channel_id': self.channel_id,
+            'name': self.name,
+            'members': len(self.members),
+            'session_started': self.session_started.isoformat() if self.session_started else None,
+            'sessions': len(self.sessions),
+            'occupied_minutes': round(session_seconds / 60, 1),
+            'member_minutes': round(member_seconds / 60, 1)
+        }
+
+    def _accumulate(self, now: datetime):
+        """Fold the time since the last change into the member-seconds total"""
+        if self._last_change:
+            self.member_seconds += len(self.members) * (now - self._last_change).total_seconds()
+        self._last_change = now
+
+class VoiceIndex:
+    """Voice occupancy for a single guild with running totals"""
+
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.channels: Dict[int, ChannelOccupancy] = {}
+        self.members_in_voice = 0
+        self.active_voice_channels = 0
+        self.seeded = False
+
+    def seed(self, guild: discord.Guild):
+        """Build the index with one pass over the voice channels"""
+        now = datetime.now()
+        self.channels.clear()
+        self.members_in_voice = 0
+        self.active_voice_channels = 0
+        for channel in guild.voice_channels:
+            for member in channel.members:
+                if not member.bot:
+                    self.join(channel, member.id, now)
+        self.seeded = True
+
+    def join(self, channel: discord.VoiceChannel, member_id: int, now: datetime):
+        """Record a member entering a channel"""
+        occupancy = self.channels.get(channel.id)
+        if occupancy is None:
+            occupancy = ChannelOccupancy(channel.id, channel.name)
+            self.channels[channel.id] = occupancy
+
+        was_empty = not occupancy.members
+        if occupancy.join(member_id, now):
+            self.members_in_voice += 1
+            if was_empty:
+                self.active_voice_channels += 1
+
+    def leave(self, channel: discord.VoiceChannel, member_id: int, now: datetime):
+        """Record a member leaving a channel"""
+        occupancy = self.channels.get(channel.id)
+        if occupancy and occupancy.leave(member_id, now):
+            self.members_in_voice -= 1
+            if not occupancy.members:
+                self.active_voice_channels -= 1
+
+    def get_channel_metrics(self) -> List[Dict[str, Any]]:
+        """Per-channel time-in-voice metrics, busiest first"""
+        now = datetime.now()
+        metrics = [occupancy.get_metrics(now) for occupancy in self.channels.values()]
+        return sorted(metrics, key=lambda m: m['member_minutes'], reverse=True)
+
+class VoiceTracker:
+    """Holds one VoiceIndex per guild and routes voice state events to it"""
+
+    def __init__(self):
+        self.indexes: Dict[int, VoiceIndex] = {}
+
+    def get_index(self, guild: discord.Guild) -> VoiceIndex:
+        """Return the guild's index, seeding it from the voice channels on first use"""
+        index = self.indexes.get(guild.id)
+        if index is None:
+            index = VoiceIndex(guild.id)
+            self.indexes[guild.id] = index
+        if not index.seeded:
+            index.seed(guild)
+        return index
+
+    def invalidate(self, guild_id: Optional[int] = None):
+        """Force a reseed, e.g. after the gateway session was re-identified"""
+        if guild_id is None:
+            self.indexes.clear()
+        else:
+            self.indexes.pop(guild_id, None)
+
+    def on_voice_state_update(self, member: discord.Member,
+                              before: discord.VoiceState, after: discord.VoiceState):
+        """Apply a join, leave or move between voice channels"""
+        if member.bot or before.channel == after.channel:
+            return
+        index = self.indexes.get(member.guild.id)
+        if index is None or not index.seeded:
+            return
+
+        now = datetime.now()
+        # Stage channels are not part of guild.voice_channels, so skip them too
+        if isinstance(before.channel, discord.VoiceChannel):
+            index.leave(before.channel, member.id, now)
+        if isinstance(after.channel, discord.VoiceChannel):
+            index.join(after.channel, member.id, now)
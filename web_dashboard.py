@@ -2,53 +2,215 @@
 Web dashboard for the Discord bot
 Provides a public interface to view bot status and statistics
 """
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
+import gzip
+import hashlib
+import itertools
 import json
 import os
-from datetime import datetime
-import asyncio
-import discord
-from threading import Thread
+import threading
+from datetime import datetime, timedelta, timezone
 import time
+from config import Config
+from snapshot_log import open_journal
+from sqlite_store import SQLiteSnapshotLog
+from state_file import LatestStateReader
+from heatmap import HeatmapStore
+from history import iter_journal_history, iter_sqlite_history
+from api_common import (STREAM_HEADERS, STREAM_POLL_INTERVAL, StatusStream, heatmap_payload,
+                        offline_status, parse_history_query)
 
 app = Flask(__name__)
 
-def get_bot_data():
-    """Get current bot data from growth tracker"""
+# Written by the bot at the paths its configuration names; the web side never needs the token
+_config = Config("")
+STORAGE_BACKEND = _config.storage_backend
+DB_PATH = _config.storage_db_path
+STATE_FILE = _config.state_file
+HEATMAP_FILE = _config.heatmap_file
+LOG_DIR = _config.storage_log_dir
+RESPONSE_CACHE_SIZE = 256  # cached page/status bodies (one per URL)
+
+_state_reader = None
+_snapshot_stores = threading.local()  # One read-only SQLite connection per request thread
+_response_cache = {}
+
+def get_state_reader():
+    """Open the bot's memory-mapped state file once and reuse the mapping"""
+    global _state_reader
+    if _state_reader is None and os.path.exists(STATE_FILE):
+        _state_reader = LatestStateReader(STATE_FILE)
+    return _state_reader
+
+def get_snapshot_version():
+    """Changes whenever the bot publishes new stats; None when there is no state file to key on"""
+    reader = get_state_reader()
+    return reader.sequence() if reader else None
+
+class CachedResponse:
+    """A rendered body with its pre-compressed copy and validators, reused until the snapshot version moves"""
+    
+    def __init__(self, version, body: bytes, mimetype: str, last_modified):
+        self.version = version
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6)
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.last_modified = last_modified
+    
+    def respond(self) -> Response:
+        """Serve the body (gzipped when accepted), or a 304 when the client's copy is current"""
+        compressed = request.accept_encodings['gzip'] > 0
+        response = Response(self.gzip_body if compressed else self.body, mimetype=self.mimetype)
+        if compressed:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        # Encodings are different representations, so their strong ETags differ too
+        response.set_etag(f"{self.etag}-gzip" if compressed else self.etag)
+        response.last_modified = self.last_modified
+        response.cache_control.no_cache = True  # Always revalidate, the 304 is cheap
+        return response.make_conditional(request)
+
+def cached_response(render, mimetype: str) -> Response:
+    """Serve a response rendered at most once per snapshot version and URL
+
+    ``render`` returns the body and its data's modification time.
+    """
+    version = get_snapshot_version()
+    key = request.full_path
+    entry = _response_cache.get(key)
+    if entry is None or version is None or entry.version != version:
+        body, last_modified = render()
+        entry = CachedResponse(version, body.encode() if isinstance(body, str) else body, mimetype, last_modified)
+        if version is not None:
+            if len(_response_cache) >= RESPONSE_CACHE_SIZE:
+                _response_cache.clear()
+            _response_cache[key] = entry
+    return entry.respond()
+
+def get_last_modified(bot_data):
+    """Time of the data in a status payload"""
     try:
-        if os.path.exists('growth_data.json'):
-            with open('growth_data.json', 'r') as f:
-                data = json.load(f)
-                if data['daily_snapshots']:
-                    latest = data['daily_snapshots'][-1]
-                    return {
-                        'status': 'online',
-                        'total_members': latest['total_members'],
-                        'online_members': latest['online_members'],
-                        'last_update': latest['timestamp'],
-                        'guild_id': latest['guild_id']
-                    }
+        return datetime.fromisoformat(bot_data['last_update']).astimezone(timezone.utc).replace(microsecond=0)
+    except (TypeError, ValueError):
+        return None
+
+def get_sqlite_store():
+    """Open this thread's read-only connection to the bot's database once and reuse it"""
+    store = getattr(_snapshot_stores, 'store', None)
+    if store is None and os.path.exists(DB_PATH):
+        # Read-only connection; WAL lets it see a consistent state while the bot writes
+        store = _snapshot_stores.store = SQLiteSnapshotLog(DB_PATH, 'daily_snapshots', timedelta(days=7), readonly=True)
+    return store
+
+def get_latest_snapshot(guild_id=None):
+    """Read the newest snapshot (of one guild, if given) from whichever storage the bot writes"""
+    if STORAGE_BACKEND == 'sqlite':
+        store = get_sqlite_store()
+        return store.latest(guild_id) if store else None
+    
+    if os.path.isdir(os.path.join(LOG_DIR, 'daily')):
+        return open_journal(LOG_DIR, 'daily').latest(guild_id)
+    return None
+
+def get_bot_data(guild_id=None):
+    """Get current bot data, from the state file when the bot publishes one"""
+    try:
+        reader = get_state_reader()
+        states = reader.read(guild_id) if reader else []
+        if states:
+            state = states[0]
+            return {
+                'status': 'online',
+                'total_members': state['total_members'],
+                'online_members': state['online_members'],
+                'members_in_voice': state['members_in_voice'],
+                'boost_count': state['boost_count'],
+                'last_update': datetime.fromtimestamp(state['updated_at']).isoformat(),
+                'guild_id': state['guild_id']
+            }
+        
+        # Older bots only write snapshot history
+        latest = get_latest_snapshot(guild_id)
+        if latest:
+            return {
+                'status': 'online',
+                'total_members': latest['total_members'],
+                'online_members': latest['online_members'],
+                'last_update': latest['timestamp'],
+                'guild_id': latest['guild_id']
+            }
     except Exception as e:
         print(f"Error reading bot data: {e}")
     
-    return {
-        'status': 'offline',
-        'total_members': 0,
-        'online_members': 0,
-        'last_update': None,
-        'guild_id': None
-    }
+    return offline_status()
 
 @app.route('/')
 def dashboard():
-    """Main dashboard page"""
-    bot_data = get_bot_data()
-    return render_template('dashboard.html', data=bot_data)
+    """Main dashboard page, rendered once per snapshot version"""
+    def render():
+        bot_data = get_bot_data()
+        return render_template('dashboard.html', data=bot_data), get_last_modified(bot_data)
+    return cached_response(render, 'text/html')
 
 @app.route('/api/status')
 def api_status():
-    """API endpoint for bot status"""
-    return jsonify(get_bot_data())
+    """API endpoint for bot status, rendered once per snapshot version"""
+    def render():
+        bot_data = get_bot_data(request.args.get('guild', type=int))
+        return jsonify(bot_data).get_data(), get_last_modified(bot_data)
+    return cached_response(render, 'application/json')
+
+@app.route('/api/history')
+def api_history():
+    """Downsampled member history, streamed as a JSON array"""
+    guild_id = request.args.get('guild', type=int) or get_bot_data()['guild_id']
+    try:
+        start, end, resolution = parse_history_query(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if guild_id is None:
+        return jsonify({'error': "no dashboard guild to read history for"}), 400
+    
+    if STORAGE_BACKEND == 'sqlite':
+        points = iter_sqlite_history(DB_PATH, guild_id, start, end, resolution)
+    else:
+        points = iter_journal_history(LOG_DIR, guild_id, start, end, resolution)
+    # Run the query up to its first point now, so storage errors fail the request instead of the body
+    first = next(points, None)
+    points = itertools.chain([first], points) if first is not None else iter(())
+    
+    def generate():
+        yield f'{{"guild_id": {guild_id}, "resolution": "{resolution}", "points": ['
+        for index, point in enumerate(points):
+            yield ("," if index else "") + json.dumps(point)
+        yield ']}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+@app.route('/api/heatmap')
+def api_heatmap():
+    """Hour-of-week activity heatmap as saved by the bot (refreshed hourly)"""
+    guild_id = request.args.get('guild', type=int) or get_bot_data()['guild_id']
+    heatmap = HeatmapStore(HEATMAP_FILE).load().get(guild_id) if guild_id is not None else None
+    body, status = heatmap_payload(guild_id, heatmap)
+    return jsonify(body), status
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events stream that pushes the status whenever the bot publishes a change"""
+    guild_id = request.args.get('guild', type=int)
+    
+    def generate():
+        stream = StatusStream()
+        while True:
+            reader = get_state_reader()
+            frame = stream.poll(reader.version() if reader else None, lambda: get_bot_data(guild_id))
+            if frame:
+                yield frame
+            time.sleep(STREAM_POLL_INTERVAL)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=STREAM_HEADERS)
 
 @app.route('/api/health')
 def health_check():
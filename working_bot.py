@@ -29,11 +29,11 @@ def main():
         
         print("🚀 Starting Modern Paranoia Community Statistics Bot...")
         print(f"📋 Target Channel: #general (ID: {channel_id})")
-        print("⏱️  Update Interval: 1 minute")
+        print(f"⏱️  Update Interval: adaptive, {config.update_interval_min}s to {config.update_interval_max}s")
         print("🔄 Bot is starting up with modern design...")
         
         # Run the bot
-        bot.run(bot_token)
+        bot.run(bot_token, log_handler=None)  # bot.py sets up the queued JSON logging
         
     except KeyboardInterrupt:
         print("\n🛑 Bot stopped by user")
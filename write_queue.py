@@ -0,0 +1,195 @@
+"""
+Outbound Discord write queue
+Paces one channel's sends and edits with a token bucket; a newer write replaces any pending older one
+"""
+
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import aiohttp
+import discord
+from metrics import WRITE_QUEUE_WRITES
+
+logger = logging.getLogger(__name__)
+
+Write = Callable[[], Awaitable[object]]
+DoneCallback = Callable[[Optional[BaseException]], None]
+_SUPERSEDED = object()  # Marks a retried write that a newer one replaced
+
+class TokenBucket:
+    """``capacity`` requests per ``period`` seconds, refilled continuously"""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period  # Tokens per second
+        self._tokens = float(capacity)
+        self._updated: Optional[float] = None
+
+    def _refill(self, now: float):
+        if self._updated is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait for a token and take it"""
+        loop = asyncio.get_running_loop()
+        self._refill(loop.time())
+        while self._tokens < 1:
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+            self._refill(loop.time())
+        self._tokens -= 1
+
+    def drain(self):
+        """Empty the bucket after a 429, so writes resume at the refill rate"""
+        self._tokens = 0.0
+
+class WriteQueue:
+    """Per-channel outbound writes, one pending write per key (latest wins)"""
+
+    def __init__(self, name: str, bucket: TokenBucket, max_retries: int = 5,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 on_rate_limit: Optional[Callable[[float, str], None]] = None):
+        self.name = name
+        self.bucket = bucket
+        self.max_retries = max_retries  # Retries of one write before it is given up
+        self.backoff_base = backoff_base  # First backoff ceiling for server errors, doubled per attempt
+        self.backoff_max = backoff_max
+        self.on_rate_limit = on_rate_limit  # Called with (retry_after, source) on every 429
+
+        self.submitted = 0
+        self.written = 0  # Writes that reached Discord
+        self.dropped = 0  # Writes replaced by a newer one before they went out
+        self.retried = 0
+        self.failed = 0  # Writes given up on (client errors or retries exhausted)
+
+        self._pending: Dict[str, Tuple[Write, Optional[DoneCallback]]] = {}
+        self._in_flight = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background writer"""
+        if not self.is_running():
+            self._task = asyncio.create_task(self._run(), name=f"write-queue-{self.name}")
+
+    def stop(self):
+        """Cancel the background writer; pending writes are discarded"""
+        if self._task:
+            self._task.cancel()
+        self._task = None
+        self._pending.clear()
+
+    def is_running(self) -> bool:
+        """Check whether the writer is active"""
+        return self._task is not None and not self._task.done()
+
+    def submit(self, key: str, write: Write, on_done: Optional[DoneCallback] = None):
+        """Queue a write, replacing a pending one with the same key
+
+        ``on_done`` receives None once the write went out, or the error it was given up on.
+        Replaced writes never call it, their successor reports instead.
+        """
+        self.submitted += 1
+        if key in self._pending:
+            self.dropped += 1
+            WRITE_QUEUE_WRITES.inc(result="dropped")
+            logger.debug(f"🗑️  Replaced pending '{key}' write in {self.name}")
+        self._pending[key] = (write, on_done)
+        self._wakeup.set()
+
+    def depth(self) -> int:
+        """Writes waiting or in flight"""
+        return len(self._pending) + self._in_flight
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters for logging and metrics"""
+        return {
+            'depth': self.depth(),
+            'submitted': self.submitted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'retried': self.retried,
+            'failed': self.failed
+        }
+
+    async def _run(self):
+        """Send pending writes in submission order, paced by the bucket"""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                key = next(iter(self._pending))
+                write, on_done = self._pending.pop(key)
+                self._in_flight = 1
+                try:
+                    error = await self._attempt(key, write)
+                finally:
+                    self._in_flight = 0
+                if error is _SUPERSEDED:
+                    continue
+                if error is None:
+                    self.written += 1
+                    WRITE_QUEUE_WRITES.inc(result="written")
+                else:
+                    self.failed += 1
+                    WRITE_QUEUE_WRITES.inc(result="failed")
+                if on_done:
+                    try:
+                        on_done(error)
+                    except Exception as e:
+                        logger.error(f"❌ Write callback failed in {self.name}: {e}")
+
+    async def _attempt(self, key: str, write: Write):
+        """Run one write with retries; returns None, the final error, or _SUPERSEDED"""
+        attempt = 0
+        while True:
+            await self.bucket.acquire()
+            try:
+                await write()
+                return None
+            except discord.RateLimited as e:
+                error, delay = e, self._rate_limited(e.retry_after, "client_timeout")
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    error, delay = e, self._rate_limited(_retry_after(e), "http_429")
+                elif e.status >= 500:
+                    error, delay = e, self._backoff(attempt)
+                else:
+                    return e  # Client errors (Forbidden, NotFound, ...) will not succeed on retry
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                error, delay = e, self._backoff(attempt)
+            except Exception as e:
+                return e
+
+            if attempt >= self.max_retries:
+                logger.error(f"❌ Giving up on '{key}' write in {self.name} after {attempt + 1} attempts: {error}")
+                return error
+            attempt += 1
+            self.retried += 1
+            WRITE_QUEUE_WRITES.inc(result="retried")
+            logger.warning(f"🔁 '{key}' write in {self.name} failed ({error}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            if key in self._pending:
+                # A newer write for the same key arrived while we waited, it goes out instead
+                self.dropped += 1
+                WRITE_QUEUE_WRITES.inc(result="dropped")
+                return _SUPERSEDED
+
+    def _rate_limited(self, retry_after: float, source: str) -> float:
+        """Delay before retrying a rate-limited write: Retry-After plus a little jitter"""
+        self.bucket.drain()
+        if self.on_rate_limit:
+            self.on_rate_limit(retry_after, source)
+        return retry_after + random.uniform(0, min(1.0, retry_after * 0.1))
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+def _retry_after(error: discord.HTTPException) -> float:
+    """Retry-After of a 429 response (seconds)"""
+    try:
+        return float(error.response.headers.get('Retry-After', 5))
+    except (AttributeError, TypeError, ValueError):
+        return 5.0